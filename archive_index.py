@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from metrics import CACHE_LOOKUPS, metrics
+from packfile import PACK_INDEX_FILE, open_pack
+from page_store import REF_SUFFIX
+
+class _Snapshot:
+    __slots__ = ('mtime', 'pages', 'pending', 'pack_mtime', 'packed_pages', 'sorted_pages')
+
+    def __init__(self):
+        self.mtime = None
+        self.pages = set()
+        self.pack_mtime = None
+        self.packed_pages = set()
+        self.pending = set() # foldere fără index.html(.ref) (pagini încă în curs de salvare)
+        self.sorted_pages = []
+
+
+class _Site:
+    __slots__ = ('mtime', 'snapshots', 'sorted_snapshots')
+
+    def __init__(self):
+        self.mtime = None
+        self.snapshots = {}
+        self.sorted_snapshots = []
+
+
+class ArchiveIndex:
+    """
+    Indexul în memorie al arhivei: domenii, snapshot-uri și pagini.
+
+    Este construit la pornirea serverului și ținut la zi prin verificarea
+    mtime-ului directoarelor: un director este recitit doar dacă s-a schimbat,
+    iar verificarea se face cel mult o dată la `refresh_interval` secunde.
+    Directoarele care încep cu "_" (depozite interne) sunt ignorate.
+    """
+
+    def __init__(self, archive_dir, refresh_interval=2.0):
+        self.archive_dir = archive_dir
+        self.refresh_interval = refresh_interval
+
+        self._mtime = None
+        self._sites = {}
+        self._sorted_sites = []
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def sites(self):
+        self.refresh()
+        return self._sorted_sites
+
+    def snapshots(self, site):
+        """Snapshot-urile unui domeniu (cel mai recent primul) sau None."""
+
+        self.refresh()
+        entry = self._sites.get(site)
+        return entry.sorted_snapshots if entry else None
+
+    def pages(self, site, version):
+        """Folderele de pagini (care conțin index.html sau index.html.ref) ale unui snapshot sau None."""
+
+        self.refresh()
+        entry = self._sites.get(site)
+        snapshot = entry.snapshots.get(version) if entry else None
+        return snapshot.sorted_pages if snapshot else None
+
+    def search(self, query):
+        """
+        Caută query (litere mici) în numele domeniilor, snapshot-urilor și
+        paginilor. Întoarce tupluri (tip, domeniu, snapshot, pagină).
+        """
+
+        self.refresh()
+        results = []
+        for site in self._sorted_sites:
+            if query in site.lower():
+                results.append(('site', site, None, None))
+            site_entry = self._sites.get(site)
+            if site_entry is None:
+                continue
+            for version in site_entry.sorted_snapshots:
+                if query in version.lower():
+                    results.append(('snapshot', site, version, None))
+                snapshot = site_entry.snapshots.get(version)
+                if snapshot is None:
+                    continue
+                for page in snapshot.sorted_pages:
+                    if query in page.lower():
+                        results.append(('page', site, version, page))
+        return results
+
+    def refresh(self, force=False):
+        """Recitește directoarele modificate de la ultima verificare."""
+
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked_at < self.refresh_interval:
+                metrics.inc(CACHE_LOOKUPS, cache='archive_index', result='hit')
+                return
+            metrics.inc(CACHE_LOOKUPS, cache='archive_index', result='miss')
+            self._checked_at = now
+
+            mtime = _mtime(self.archive_dir)
+            if mtime is None:
+                self._mtime, self._sites, self._sorted_sites = None, {}, []
+                return
+            if mtime != self._mtime:
+                self._mtime = mtime
+                names = _list_dirs(self.archive_dir)
+                self._sites = {name: self._sites.get(name) or _Site() for name in names}
+                self._sorted_sites = sorted(self._sites)
+
+            for site, site_entry in self._sites.items():
+                self._refresh_site(os.path.join(self.archive_dir, site), site_entry)
+
+    def _refresh_site(self, site_dir, site_entry):
+        mtime = _mtime(site_dir)
+        if mtime != site_entry.mtime:
+            site_entry.mtime = mtime
+            names = _list_dirs(site_dir) if mtime is not None else []
+            site_entry.snapshots = {name: site_entry.snapshots.get(name) or _Snapshot() for name in names}
+            # Timestamp folders: most recent first
+            site_entry.sorted_snapshots = sorted(site_entry.snapshots, reverse=True)
+
+        for version, snapshot in site_entry.snapshots.items():
+            self._refresh_snapshot(os.path.join(site_dir, version), snapshot)
+
+    def _refresh_snapshot(self, snapshot_dir, snapshot):
+        mtime = _mtime(snapshot_dir)
+        changed = False
+
+        if mtime != snapshot.mtime:
+            snapshot.mtime = mtime
+            folders = set(_list_dirs(snapshot_dir)) if mtime is not None else set()
+            snapshot.pages &= folders
+            snapshot.pending = folders - snapshot.pages
+            changed = True
+
+        # Packed snapshots list their pages from the pack index
+        pack_mtime = _mtime(os.path.join(snapshot_dir, PACK_INDEX_FILE))
+        if pack_mtime != snapshot.pack_mtime:
+            snapshot.pack_mtime = pack_mtime
+            reader = open_pack(snapshot_dir) if pack_mtime is not None else None
+            snapshot.packed_pages = reader.page_folders() if reader else set()
+            changed = True
+
+        # Folders whose index.html (or its page store reference) was not written yet at the last check
+        for folder in list(snapshot.pending):
+            page_filename = os.path.join(snapshot_dir, folder, 'index.html')
+            if os.path.exists(page_filename) or os.path.exists(page_filename + REF_SUFFIX):
+                snapshot.pending.discard(folder)
+                snapshot.pages.add(folder)
+                changed = True
+
+        if changed:
+            snapshot.sorted_pages = sorted(snapshot.pages | snapshot.packed_pages)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _list_dirs(path):
+    try:
+        with os.scandir(path) as entries:
+            return [entry.name for entry in entries
+                    if not entry.name.startswith('_') and entry.is_dir()]
+    except OSError:
+        return []
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import threading
+import uuid
+from utils import write_precompressed
+
+STORE_DIR_NAME = "_store"
+NOT_MODIFIED = "not-modified" # Răspuns 304 la o cerere condițională
+
+class AssetStore:
+    """
+    Depozit de resurse comun tuturor snapshot-urilor unui domeniu.
+
+    Fișierele sunt salvate în archive/<domeniu>/_store/ sub numele
+    <sha256 conținut><extensie>, deci un CSS sau un logo identic este păstrat o
+    singură dată. Indexul URL -> fișier din memorie garantează că un URL este
+    descărcat o singură dată pe rulare, chiar dacă mai multe thread-uri îl
+    cer simultan.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+        self._index = {} # URL -> nume fișier (None dacă descărcarea a eșuat)
+        self._pending = {} # URL -> threading.Event pentru descărcările în curs
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_snapshot(cls, snapshot_root):
+        """Întoarce depozitul domeniului căruia îi aparține snapshot_root."""
+
+        root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(snapshot_root)), STORE_DIR_NAME))
+        with cls._instances_lock:
+            store = cls._instances.get(root)
+            if store is None:
+                store = cls._instances[root] = cls(root)
+            return store
+
+    def fetch(self, url, extension, download, previous_name=None):
+        """
+        Întoarce numele fișierului din depozit pentru url, descărcându-l cu
+        `download(url, cale_temporara)` doar dacă URL-ul nu a mai fost cerut.
+        Dacă `download` întoarce NOT_MODIFIED, este refolosit `previous_name`
+        (fișierul din snapshot-ul anterior). Întoarce None dacă descărcarea a eșuat.
+        """
+
+        with self._lock:
+            if url in self._index:
+                return self._index[url]
+            event = self._pending.get(url)
+            if event is None:
+                self._pending[url] = threading.Event()
+
+        if event is not None:
+            # Another thread is already downloading this URL
+            event.wait()
+            with self._lock:
+                return self._index.get(url)
+
+        name = None
+        tmp_path = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}{extension}")
+        try:
+            result = download(url, tmp_path)
+            if result == NOT_MODIFIED:
+                name = previous_name
+            elif result:
+                name = self._commit(tmp_path, extension)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            with self._lock:
+                self._index[url] = name
+                self._pending.pop(url).set()
+        return name
+
+    def path(self, name):
+        """Calea pe disc a unui fișier din depozit."""
+
+        return os.path.join(self.root, name)
+
+    def exists(self, name):
+        return bool(name) and os.path.exists(self.path(name))
+
+    def _commit(self, tmp_path, extension):
+        sha = hashlib.sha256()
+        with open(tmp_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                sha.update(chunk)
+
+        name = sha.hexdigest() + extension
+        final_path = self.path(name)
+        if not os.path.exists(final_path):
+            os.replace(tmp_path, final_path)
+            write_precompressed(final_path)
+        return name
@@ -0,0 +1,310 @@
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError: # aiohttp este opțional; fără el crawler-ul rămâne pe thread-uri
+    aiohttp = None
+
+from asset_store import AssetStore, NOT_MODIFIED
+from downloader import (HEADERS, PARSER_ENGINE, conditional_headers, link_resources, prepare_page,
+                        previous_asset_entry, previous_page_entry, record_asset, reuse_previous_page,
+                        save_page, write_bytes)
+from frontier import normalize_url
+from metrics import DOWNLOADED_BYTES, ERRORS, PAGES, STAGE_SECONDS, metrics
+from utils import get_local_page_folder_name
+
+MAX_IN_FLIGHT = 1000 # Cereri HTTP simultane în total (pagini și resurse)
+RESOURCE_HOST_LIMIT = 64 # Cereri simultane pentru resurse către același host
+PARSE_WORKERS = 2 # Thread-uri pentru parsare, rescriere și scriere pe disc
+RETRIES = 2
+BACKOFF = 0.5 # Secunde; pauza se dublează la fiecare reîncercare
+RETRY_STATUSES = {429, 502, 503, 504}
+PAGE_TIMEOUT = 15
+RESOURCE_TIMEOUT = 10
+
+AIOHTTP_AVAILABLE = aiohttp is not None
+
+
+class _Host:
+    __slots__ = ('pages', 'resources', 'delay', 'delay_lock', 'last_start')
+
+    def __init__(self, per_host_limit, delay):
+        self.pages = asyncio.Semaphore(per_host_limit)
+        self.resources = asyncio.Semaphore(RESOURCE_HOST_LIMIT)
+        self.delay = delay
+        self.delay_lock = asyncio.Lock()
+        self.last_start = float('-inf')
+
+
+class AsyncCrawler:
+    """
+    Crawler asyncio (aiohttp) pentru modul fără Selenium.
+
+    Un singur thread ține în zbor până la `max_in_flight` cereri (pagini și
+    resurse), cu cel mult `per_host_limit` pagini simultane și `host_delay`
+    secunde între două pagini cerute aceluiași host, ca Frontier-ul din
+    modul cu thread-uri. Parsarea, rescrierea și scrierea pe disc rulează
+    într-un executor mic, pentru a nu bloca bucla de evenimente.
+    """
+
+    def __init__(self, start_url, snapshot_root, workers=200, per_host_limit=2, host_delay=0.5, state=None,
+                 manifest=None, previous=None, parser=PARSER_ENGINE, search_index=None,
+                 max_in_flight=MAX_IN_FLIGHT, seeds=(), host_delays=None, unchanged=None):
+        self.start_url = start_url
+        self.snapshot_root = snapshot_root
+        self.workers = workers
+        self.per_host_limit = per_host_limit
+        self.host_delay = host_delay
+        self.state = state
+        self.manifest = manifest
+        self.previous = previous
+        self.parser = parser
+        self.search_index = search_index
+        self.max_in_flight = max_in_flight
+        self.seeds = seeds
+        self.host_delays = host_delays or {}
+        self.unchanged = unchanged
+
+        self.base_netloc = urlparse(self.start_url).netloc
+        self.store = AssetStore.for_snapshot(snapshot_root)
+        self.seen = set()
+        self.saved = 0
+
+        self._hosts = {}
+        self._resources = {} # URL -> task-ul care îl salvează în depozit (o singură cerere per URL)
+
+    async def run(self):
+        """Rulează crawl-ul până la golirea cozii; întoarce numărul de pagini salvate."""
+
+        self._queue = asyncio.Queue()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS)
+
+        known_urls, pending_urls = self.state.load() if self.state else ([], [])
+        if known_urls:
+            self.seen.update(normalize_url(url) for url in known_urls)
+            for url in pending_urls:
+                self._queue.put_nowait(url)
+            print(f"[crawl] Reiau crawl-ul: {len(known_urls)} URL-uri cunoscute, {len(pending_urls)} rămase în coadă")
+        else:
+            for url in (self.start_url, *self.seeds):
+                self._add(url)
+
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight, ttl_dns_cache=300)
+        try:
+            async with aiohttp.ClientSession(headers=HEADERS, connector=connector) as session:
+                self._session = session
+                tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+                try:
+                    await self._queue.join()
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._executor.shutdown(wait=True)
+        return self.saved
+
+    def _add(self, url):
+        key = normalize_url(url)
+        if key in self.seen:
+            return
+        self.seen.add(key)
+        self._queue.put_nowait(url)
+        if self.state:
+            self.state.queued(url)
+
+    async def _worker(self):
+        while True:
+            url = await self._queue.get()
+            saved = 0
+            try:
+                saved = await self._process(url)
+                self.saved += saved
+            except Exception as e:
+                metrics.inc(ERRORS, category='page')
+                print(f"[eroare] Nu am putut descărca {url} — {e}")
+            finally:
+                if self.state:
+                    self.state.finished(url, ok=bool(saved))
+                self._queue.task_done()
+
+    async def _process(self, url):
+        print(f"[crawl] Procesez: {url}")
+
+        output_dir = os.path.join(self.snapshot_root, get_local_page_folder_name(url))
+        result = await self.download_page(url, output_dir)
+        if not result:
+            print(f"[skip-links] Nu am putut obține HTML pentru {url}")
+            return 0
+
+        _html, _document, internal_links, page_saved = result
+        for link in internal_links:
+            if urlparse(link).netloc == self.base_netloc:
+                self._add(link)
+        return 1 if page_saved else 0
+
+    async def download_page(self, url, output_dir):
+        """Echivalentul asincron al downloader.download_page (fără Selenium)."""
+
+        os.makedirs(output_dir, exist_ok=True)
+        previous_entry = previous_page_entry(self.previous, url)
+
+        # Unchanged according to the sitemap's <lastmod>: no request at all
+        if self.unchanged and previous_entry and url in self.unchanged:
+            result = await self._offload(reuse_previous_page, url, previous_entry, self.previous, output_dir,
+                                         self.snapshot_root, self.manifest, self.search_index)
+            if result:
+                return result
+
+        # A 304 reuses the previous snapshot; if that copy is gone, fetch unconditionally
+        for headers in (conditional_headers(previous_entry), {}):
+            with metrics.timer(STAGE_SECONDS, stage='fetch'):
+                response = await self._get(url, headers, page=True)
+            if response is None:
+                metrics.inc(PAGES, result='failed')
+                return None
+            status, response_headers, body, charset = response
+            if status != 304 or not headers:
+                break
+            result = await self._offload(reuse_previous_page, url, previous_entry, self.previous, output_dir,
+                                         self.snapshot_root, self.manifest, self.search_index)
+            if result:
+                return result
+
+        if status >= 400:
+            metrics.inc(PAGES, result='failed')
+            metrics.inc(ERRORS, category='http')
+            print(f"[eroare-async] Nu am putut descărca {url}: HTTP {status}")
+            return None
+        try:
+            html = body.decode(charset or 'utf-8', errors='replace')
+        except LookupError:
+            html = body.decode('utf-8', errors='replace')
+        if not html:
+            metrics.inc(PAGES, result='failed')
+            print(f"[skip] Nu am putut obține HTML pentru {url}. Sărit peste descărcare.")
+            return None
+        page_validators = _validators(response_headers) if self.manifest is not None else None
+
+        document, downloads, internal_links = await self._offload(prepare_page, url, html,
+                                                                   self.snapshot_root, self.parser)
+
+        with metrics.timer(STAGE_SECONDS, stage='resources'):
+            names = await asyncio.gather(*(self._resource(resource_url, extension, kind)
+                                           for resource_url, (extension, kind, _refs) in downloads.items()))
+        stored_names = dict(zip(downloads, names))
+
+        def finish():
+            link_resources(document, downloads, stored_names, self.snapshot_root)
+            return save_page(url, html, document, internal_links, downloads, output_dir, self.snapshot_root,
+                             manifest=self.manifest, search_index=self.search_index,
+                             page_validators=page_validators)
+
+        return await self._offload(finish)
+
+    def _resource(self, url, extension, kind):
+        task = self._resources.get(url)
+        if task is None:
+            task = self._resources[url] = asyncio.ensure_future(self._fetch_resource(url, extension, kind))
+        return task
+
+    async def _fetch_resource(self, url, extension, kind):
+        previous_asset, previous_name = previous_asset_entry(self.previous, self.store, url)
+        headers = conditional_headers(previous_asset)
+
+        response = await self._get(url, headers)
+        if response is None:
+            return None
+        status, response_headers, body, _charset = response
+
+        if status == 304 and headers:
+            validators = {}
+            download = lambda u, path: NOT_MODIFIED
+        elif status >= 400:
+            metrics.inc(ERRORS, category='http')
+            print(f"[skip-{kind}] Could not download {url}: HTTP {status}")
+            return None
+        else:
+            validators = _validators(response_headers)
+            download = lambda u, path: write_bytes(path, body)
+
+        # Hashing and writing the file happen off the event loop
+        stored_name = await self._offload(self.store.fetch, url, extension, download, previous_name=previous_name)
+        record_asset(self.manifest, self.previous, url, stored_name, previous_name, validators)
+        return stored_name
+
+    async def _get(self, url, headers=None, page=False):
+        """
+        (status, anteturi, conținut, charset) pentru url sau None după ce
+        reîncercările (RETRIES, cu pauze BACKOFF exponențiale) s-au epuizat.
+        """
+
+        host = self._hosts.get(urlparse(url).netloc)
+        if host is None:
+            netloc = urlparse(url).netloc
+            delay = max(self.host_delays.get(netloc, self.host_delay), self.host_delay)
+            host = self._hosts[netloc] = _Host(self.per_host_limit, delay)
+        timeout = aiohttp.ClientTimeout(total=PAGE_TIMEOUT if page else RESOURCE_TIMEOUT)
+
+        for attempt in range(RETRIES + 1):
+            try:
+                async with host.pages if page else host.resources:
+                    if page:
+                        await self._wait_turn(host)
+                    async with self._in_flight:
+                        async with self._session.get(url, headers=headers, timeout=timeout) as response:
+                            body = await response.read()
+                            metrics.inc(DOWNLOADED_BYTES, len(body), kind='page' if page else 'resource')
+                            if response.status not in RETRY_STATUSES or attempt == RETRIES:
+                                return response.status, response.headers, body, response.charset
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == RETRIES:
+                    metrics.inc(ERRORS, category='network')
+                    print(f"[eroare-async] Nu am putut descărca {url}: {e!r}")
+                    return None
+            await asyncio.sleep(BACKOFF * 2 ** attempt)
+
+    async def _wait_turn(self, host):
+        loop = asyncio.get_running_loop()
+        async with host.delay_lock:
+            wait = host.last_start + host.delay - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            host.last_start = loop.time()
+
+    def _offload(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+
+def _validators(headers):
+    validators = {'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified')}
+    return {key: value for key, value in validators.items() if value}
+
+
+def crawl_domain_async(start_url, snapshot_root, workers=200, per_host_limit=2, host_delay=0.5, state=None,
+                       seeds=(), host_delays=None, **download_options):
+    """
+    Varianta asyncio a lui crawler.crawl_domain pentru modul fără Selenium;
+    `workers` este numărul de pagini procesate simultan. Întoarce mulțimea
+    URL-urilor (normalizate) văzute în timpul crawl-ului.
+    """
+
+    crawler = AsyncCrawler(start_url, snapshot_root, workers=workers, per_host_limit=per_host_limit,
+                           host_delay=host_delay, state=state, seeds=seeds, host_delays=host_delays,
+                           **download_options)
+
+    started = time.monotonic()
+    saved = asyncio.run(crawler.run())
+    if state:
+        state.flush()
+
+    elapsed = time.monotonic() - started
+    print(f"[crawl] {saved} pagini arhivate în {elapsed:.1f}s ({saved / max(elapsed, 1e-9):.2f} pagini/s)")
+    return crawler.seen
@@ -0,0 +1,253 @@
+"""
+Benchmark end-to-end: arhivarea unui site sintetic servit local și latența
+rutelor serverului pe arhiva rezultată.
+
+Pentru fiecare dimensiune din --sizes, site-ul este generat (o singură dată,
+în --work-dir), servit de un server HTTP local, arhivat cu crawl_domain
+(cu manifest și index de căutare, ca în main.py), apoi rutele /, /snapshot,
+/search și /view sunt măsurate prin clientul de test Flask. Arhivarea și
+serverul rulează fiecare într-un proces separat, ca vârful de memorie (RSS)
+să fie măsurat curat.
+
+    python benchmarks/bench_archive.py [--sizes 1000,10000,100000] [--engine threads|async]
+                                       [--fanout 10] [--assets 20] [--page-kb 8] [--output FILE]
+
+Rezultatele sunt scrise în JSON (implicit benchmarks/results/<commit>.json) și
+pot fi comparate între commit-uri cu benchmarks/compare_results.py.
+"""
+import argparse
+import contextlib
+import functools
+import http.server
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError: # Windows: vârful de memorie nu este raportat
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from site_generator import generate_site
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+SNAPSHOT_NAME = "bench"
+# A word found on almost every page and one found on a single page
+SEARCH_QUERIES = {'/search:common': 'lorem', '/search:rare': 'page{middle}'}
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive, ca un server real
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_directory(directory):
+    """Servește directorul pe 127.0.0.1 (port liber) într-un thread; întoarce URL-ul de bază."""
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(_QuietHandler, directory=directory))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def latency_stats(samples):
+    ordered = sorted(samples)
+    def percentile(p):
+        return ordered[min(int(len(ordered) * p), len(ordered) - 1)] * 1000
+    return {
+        'requests': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def run_crawl(url, archive_dir, engine, workers):
+    """Faza de arhivare (rulează în procesul copil)."""
+
+    from crawler import crawl_domain
+    from manifest import Manifest
+    from metrics import DOWNLOADED_BYTES, PAGES, metrics
+    from search_index import SearchIndex, SEARCH_DB_FILE
+    from urllib.parse import urlparse
+
+    snapshot_dir = os.path.join(archive_dir, urlparse(url).netloc, SNAPSHOT_NAME)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    manifest = Manifest(snapshot_dir)
+    search_index = SearchIndex(os.path.join(archive_dir, SEARCH_DB_FILE))
+
+    metrics.reset()
+    started = time.perf_counter()
+    # Per-page progress lines would dominate the run (and its memory if captured)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        crawl_domain(url, snapshot_dir, use_selenium=False, workers=workers, per_host_limit=workers,
+                     host_delay=0, fetch_engine=engine, manifest=manifest, search_index=search_index)
+        manifest.save()
+        search_index.close()
+    seconds = time.perf_counter() - started
+
+    pages = metrics.totals(PAGES, 'result')
+    return {
+        'engine': engine,
+        'workers': workers,
+        'seconds': seconds,
+        'pages_saved': pages.get('saved', 0),
+        'pages_failed': pages.get('failed', 0),
+        'pages_per_s': pages.get('saved', 0) / seconds,
+        'downloaded_mb': sum(metrics.totals(DOWNLOADED_BYTES, 'kind').values()) / (1024 * 1024),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def run_server(archive_dir, requests_per_route, pages):
+    """Faza de server (rulează în procesul copil): latența rutelor prin clientul de test Flask."""
+
+    import server
+
+    server.ARCHIVE_DIR = archive_dir
+    client = server.app.test_client()
+    site = next(name for name in sorted(os.listdir(archive_dir)) if not name.startswith('_')
+                and os.path.isdir(os.path.join(archive_dir, name)))
+
+    def timed(path):
+        started = time.perf_counter()
+        response = client.get(path)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} a răspuns {response.status_code}")
+        return elapsed
+
+    # The first request builds the archive index from disk
+    results = {'cold_index_ms': timed('/') * 1000}
+
+    view_paths = [f"/view/{site}/{SNAPSHOT_NAME}/{'index' if i == 0 else f'p_{i}'}/index.html"
+                  for i in range(0, pages, max(pages // requests_per_route, 1))]
+    routes = {
+        '/': ['/'],
+        '/snapshot': [f"/snapshot/{site}/{SNAPSHOT_NAME}"],
+        '/view': view_paths,
+    }
+    for route, query in SEARCH_QUERIES.items():
+        routes[route] = [f"/search?query={query.format(middle=pages // 2)}"]
+
+    for route, paths in routes.items():
+        samples = [timed(paths[i % len(paths)]) for i in range(requests_per_route)]
+        results[route] = latency_stats(samples)
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def run_phase(args):
+    """Rulează o fază într-un proces nou și întoarce rezultatul ei (JSON pe ultima linie)."""
+
+    command = [sys.executable, os.path.abspath(__file__), '--phase'] + args
+    output = subprocess.run(command, check=True, capture_output=True, text=True, cwd=REPO_DIR).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                                    check=True, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+    return commit, dirty
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000', help="numărul de pagini, separat prin virgulă")
+    parser.add_argument('--fanout', type=int, default=10, help="link-uri aleatoare per pagină")
+    parser.add_argument('--assets', type=int, default=20, help="resurse comune ale site-ului")
+    parser.add_argument('--page-kb', type=int, default=8, help="dimensiunea aproximativă a unei pagini")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--engine', default='threads', choices=('threads', 'async'))
+    parser.add_argument('--workers', type=int, default=None, help="implicit 8 (threads) sau 64 (async)")
+    parser.add_argument('--requests', type=int, default=200, help="cereri măsurate per rută")
+    parser.add_argument('--work-dir', default=os.path.join(BENCH_DIR, '.work'))
+    parser.add_argument('--output', help="fișierul JSON cu rezultatele")
+    parser.add_argument('--phase', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        # Internal: one measured phase in a fresh process
+        if args.phase[0] == 'crawl':
+            _phase, url, archive_dir, engine, workers = args.phase
+            result = run_crawl(url, archive_dir, engine, int(workers))
+        else:
+            _phase, archive_dir, requests_per_route, pages = args.phase
+            result = run_server(archive_dir, int(requests_per_route), int(pages))
+        print(json.dumps(result))
+        return
+
+    workers = args.workers or (64 if args.engine == 'async' else 8)
+    work_dir = os.path.abspath(args.work_dir)
+    commit, dirty = git_commit()
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {'fanout': args.fanout, 'assets': args.assets, 'page_kb': args.page_kb, 'seed': args.seed,
+                   'engine': args.engine, 'workers': workers, 'requests': args.requests},
+        'results': [],
+    }
+
+    for pages in (int(size) for size in args.sizes.split(',')):
+        site_dir = os.path.join(work_dir, f"site-{pages}-{args.fanout}-{args.assets}-{args.page_kb}-{args.seed}")
+        archive_dir = os.path.join(work_dir, f"archive-{pages}")
+        shutil.rmtree(archive_dir, ignore_errors=True)
+
+        print(f"[bench] {pages} pagini: generez site-ul...")
+        generate_site(site_dir, pages, args.fanout, args.assets, args.page_kb, args.seed)
+
+        print(f"[bench] {pages} pagini: arhivez ({args.engine}, {workers} workers)...")
+        with serve_directory(site_dir) as url:
+            crawl = run_phase(['crawl', url, archive_dir, args.engine, str(workers)])
+        print(f"[bench]   {crawl['pages_saved']} pagini în {crawl['seconds']:.1f}s "
+              f"({crawl['pages_per_s']:.1f} pagini/s, vârf {crawl['peak_rss_mb'] or 0:.0f} MB)")
+
+        print(f"[bench] {pages} pagini: măsor rutele serverului...")
+        served = run_phase(['server', archive_dir, str(args.requests), str(pages)])
+        for route, stats in served.items():
+            if isinstance(stats, dict):
+                print(f"[bench]   {route:<22} p50 {stats['p50_ms']:8.2f} ms   p95 {stats['p95_ms']:8.2f} ms")
+
+        report['results'].append({'pages': pages, 'crawl': crawl, 'server': served})
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"[bench] Rezultate scrise în {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark pentru motoarele de parsare/rescriere din html_rewriter.
+
+Rulează pe un corpus de pagini salvate (implicit toate fișierele index.html și
+paginile din depozitele _pages/ din archive/) aceeași operație pe care o face download_page: parsare, citirea
+tuturor atributelor src/href, rescrierea lor și serializarea documentului.
+
+    python benchmarks/bench_parsers.py [corpus_dir] [--repeat N] [--engines stream,bs4]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_rewriter import ENGINES, parse_document
+from page_store import BLOB_EXTENSION, PageStore
+
+def load_corpus(corpus_dir):
+    pages = []
+    for root, _dirs, files in os.walk(corpus_dir):
+        for name in files:
+            if name.endswith(('.html', '.htm')):
+                with open(os.path.join(root, name), 'r', encoding='utf-8', errors='replace') as f:
+                    pages.append(f.read())
+            elif name.endswith(BLOB_EXTENSION):
+                data = PageStore.open(root).get(name[:-len(BLOB_EXTENSION)])
+                pages.append(data.decode('utf-8', errors='replace'))
+    return pages
+
+def rewrite(html, engine):
+    document = parse_document(html, engine)
+    for ref in list(document.refs()):
+        document.set(ref, '/rewritten/' + ref.value)
+    return document.render()
+
+def bench_engine(pages, engine, repeat):
+    total_bytes = sum(len(page.encode('utf-8')) for page in pages)
+
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for page in pages:
+            rewrite(page, engine)
+        best = min(best, time.perf_counter() - started)
+
+    # Peak memory is measured separately: tracemalloc slows everything down
+    tracemalloc.start()
+    for page in pages:
+        rewrite(page, engine)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'engine': engine,
+        'pages': len(pages),
+        'seconds': best,
+        'ms_per_page': best * 1000 / len(pages),
+        'mb_per_s': total_bytes / (1024 * 1024) / best if best else float('inf'),
+        'peak_mb': peak / (1024 * 1024),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus_dir', nargs='?', default='archive')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--engines', default=','.join(ENGINES))
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus_dir)
+    if not pages:
+        sys.exit(f"Nu am găsit pagini HTML în {args.corpus_dir}")
+
+    print(f"{len(pages)} pagini, {sum(map(len, pages)) / (1024 * 1024):.1f} MB")
+    print(f"{'motor':<8} {'ms/pagină':>10} {'MB/s':>8} {'vârf MB':>8}")
+    for engine in args.engines.split(','):
+        result = bench_engine(pages, engine, args.repeat)
+        print(f"{result['engine']:<8} {result['ms_per_page']:>10.2f} {result['mb_per_s']:>8.1f} {result['peak_mb']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
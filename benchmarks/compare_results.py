@@ -0,0 +1,55 @@
+"""
+Compară două fișiere de rezultate scrise de bench_archive.py (de exemplu
+pentru două commit-uri) și afișează diferența procentuală pentru fiecare
+valoare numerică, pe dimensiuni de arhivă.
+
+    python benchmarks/compare_results.py benchmarks/results/<vechi>.json benchmarks/results/<nou>.json
+"""
+import argparse
+import json
+import sys
+
+def flatten(value, prefix=''):
+    """{'crawl': {'seconds': 1.0}} -> {'crawl.seconds': 1.0} (doar valorile numerice)."""
+
+    if isinstance(value, dict):
+        items = {}
+        for key, child in value.items():
+            items.update(flatten(child, f"{prefix}.{key}" if prefix else key))
+        return items
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return report, {result['pages']: flatten(result) for result in report['results']}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('new')
+    args = parser.parse_args()
+
+    base_report, base = load(args.base)
+    new_report, new = load(args.new)
+    if base_report['params'] != new_report['params']:
+        print(f"[atenție] Parametri diferiți: {base_report['params']} vs {new_report['params']}")
+
+    common = sorted(set(base) & set(new))
+    if not common:
+        sys.exit("Cele două fișiere nu au nicio dimensiune de arhivă în comun.")
+
+    print(f"{base_report['commit']} -> {new_report['commit']}")
+    for pages in common:
+        print(f"\n{pages} pagini")
+        for key in sorted(set(base[pages]) & set(new[pages])):
+            if key == 'pages':
+                continue
+            old_value, new_value = base[pages][key], new[pages][key]
+            change = (new_value - old_value) / old_value * 100 if old_value else float('nan')
+            print(f"  {key:<40} {old_value:>12.2f} {new_value:>12.2f} {change:>+8.1f}%")
+
+if __name__ == "__main__":
+    main()
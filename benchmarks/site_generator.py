@@ -0,0 +1,111 @@
+"""
+Generator de site-uri sintetice pentru benchmark-uri, determinist (același
+seed produce exact aceleași fișiere).
+
+    python benchmarks/site_generator.py output_dir [--pages N] [--fanout N]
+                                       [--assets N] [--page-kb N] [--seed N]
+
+Pagina 0 este /index.html, iar pagina i este /p/<i>/index.html. Fiecare pagină
+are un link spre pagina următoare (deci toate sunt accesibile din prima),
+`fanout` link-uri spre pagini alese aleator, câteva resurse din cele
+`assets` resurse comune și text până la aproximativ `page_kb` KB.
+"""
+import argparse
+import json
+import os
+import random
+
+WORDS = ("arhivă pagină server lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+         "tempor incididunt labore dolore magna aliqua enim minim veniam quis nostrud exercitation "
+         "ullamco laboris nisi aliquip commodo consequat duis aute irure reprehenderit voluptate").split()
+
+ASSET_KINDS = ('.css', '.js', '.png')
+ASSETS_PER_PAGE = 3
+PARAMS_FILE = "site.json"
+
+def page_path(index):
+    return "/" if index == 0 else f"/p/{index}/"
+
+def generate_site(output_dir, pages=1000, fanout=10, assets=20, page_kb=8, seed=1):
+    """
+    Scrie site-ul în output_dir și întoarce parametrii lui. Dacă directorul
+    conține deja un site generat cu aceiași parametri, nu este rescris.
+    """
+
+    params = {'pages': pages, 'fanout': fanout, 'assets': assets, 'page_kb': page_kb, 'seed': seed}
+    params_path = os.path.join(output_dir, PARAMS_FILE)
+    try:
+        with open(params_path, 'r', encoding='utf-8') as f:
+            if json.load(f) == params:
+                return params
+    except (OSError, ValueError):
+        pass
+
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(output_dir, 'assets'), exist_ok=True)
+
+    asset_paths = []
+    for number in range(assets):
+        extension = ASSET_KINDS[number % len(ASSET_KINDS)]
+        path = f"/assets/a{number}{extension}"
+        asset_paths.append(path)
+        with open(os.path.join(output_dir, path.lstrip('/')), 'wb') as f:
+            f.write(_asset_content(extension, number, rng))
+
+    text_words = max(page_kb * 1024 // 7, 1) # ~7 bytes per word with the separator
+    for index in range(pages):
+        links = [page_path((index + 1) % pages)]
+        links += [page_path(rng.randrange(pages)) for _ in range(fanout)]
+        page_assets = rng.sample(asset_paths, min(ASSETS_PER_PAGE, len(asset_paths)))
+
+        head = []
+        body_assets = []
+        for path in page_assets:
+            if path.endswith('.css'):
+                head.append(f'<link rel="stylesheet" href="{path}">')
+            elif path.endswith('.js'):
+                head.append(f'<script src="{path}"></script>')
+            else:
+                body_assets.append(f'<img src="{path}" alt="">')
+
+        text = ' '.join(rng.choice(WORDS) for _ in range(text_words))
+        html = (
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+            f"<title>Pagina {index}</title>{''.join(head)}</head><body>"
+            f"<h1>Pagina {index} page{index}</h1>{''.join(body_assets)}<p>{text}</p><ul>"
+            + ''.join(f'<li><a href="{link}">{link}</a></li>' for link in links)
+            + "</ul></body></html>\n"
+        )
+
+        directory = os.path.join(output_dir, page_path(index).strip('/'))
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(html)
+
+    with open(params_path, 'w', encoding='utf-8') as f:
+        json.dump(params, f)
+    return params
+
+def _asset_content(extension, number, rng):
+    if extension == '.css':
+        return ''.join(f".c{number}-{i} {{ margin: {i}px; color: #{i:06x}; }}\n" for i in range(200)).encode()
+    if extension == '.js':
+        return ''.join(f"function f{number}_{i}() {{ return {i}; }}\n" for i in range(200)).encode()
+    return bytes(rng.getrandbits(8) for _ in range(4096))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output_dir')
+    parser.add_argument('--pages', type=int, default=1000)
+    parser.add_argument('--fanout', type=int, default=10)
+    parser.add_argument('--assets', type=int, default=20)
+    parser.add_argument('--page-kb', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    params = generate_site(args.output_dir, args.pages, args.fanout, args.assets, args.page_kb, args.seed)
+    print(f"Site generat în {args.output_dir}: {params}")
+
+if __name__ == "__main__":
+    main()
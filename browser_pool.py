@@ -0,0 +1,181 @@
+import base64
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
+
+GECKO_DRIVER_PATH = "/usr/local/bin/geckodriver"
+CAPTURE_MAX_BYTES = 5 * 1024 * 1024 # Resursele mai mari sunt descărcate separat, cu requests
+CAPTURE_TIMEOUT = 30 # Secunde
+
+# Runs inside the loaded page: re-reads every same-origin resource the page
+# loaded with cache: 'force-cache', so the bytes come from the browser's HTTP
+# cache instead of the network, and hands them back base64-encoded.
+CAPTURE_SCRIPT = """
+var done = arguments[arguments.length - 1];
+var maxBytes = arguments[0];
+var prefix = location.origin + '/';
+// Only static resources: API calls (fetch/XHR) may be no-store or have side effects
+var kinds = {img: true, script: true, link: true, css: true};
+var urls = Array.from(new Set(performance.getEntriesByType('resource')
+    .filter(function (entry) { return kinds[entry.initiatorType] && entry.name.indexOf(prefix) === 0; })
+    .map(function (entry) { return entry.name; })));
+
+function encode(buffer) {
+    var bytes = new Uint8Array(buffer), binary = '';
+    for (var i = 0; i < bytes.length; i += 32768) {
+        binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 32768));
+    }
+    return btoa(binary);
+}
+
+Promise.all(urls.map(function (url) {
+    return fetch(url, {cache: 'force-cache', credentials: 'same-origin'}).then(function (response) {
+        var length = parseInt(response.headers.get('Content-Length') || '0', 10);
+        if (!response.ok || length > maxBytes) return null;
+        return response.arrayBuffer().then(function (buffer) {
+            if (buffer.byteLength > maxBytes) return null;
+            return [response.url || url, encode(buffer),
+                    response.headers.get('ETag'), response.headers.get('Last-Modified')];
+        });
+    }).catch(function () { return null; });
+})).then(function (results) { done(results.filter(Boolean)); });
+"""
+
+def create_firefox_driver(gecko_driver_path=GECKO_DRIVER_PATH):
+    """Pornește un Firefox headless configurat pentru arhivare."""
+
+    options = FirefoxOptions()
+    options.add_argument("-headless") # Run browser in invisible mode
+    options.add_argument("--window-size=1920,1080")
+
+    service = FirefoxService(executable_path=gecko_driver_path)
+    return webdriver.Firefox(service=service, options=options)
+
+def capture_loaded_resources(driver, max_bytes=CAPTURE_MAX_BYTES):
+    """
+    Resursele statice (CSS, JS, imagini, fonturi) încărcate deja de browser
+    pentru pagina curentă, ca dicționar URL -> (conținut, {'etag',
+    'last_modified'}). Cererile fetch/XHR ale paginii nu sunt refăcute.
+
+    Sunt preluate doar resursele de pe același domeniu (cele de pe alte
+    domenii nu pot fi citite din pagină); restul rămân pentru requests.
+    Downloader-ul le folosește doar pe cele la care pagina are referințe.
+    """
+
+    driver.set_script_timeout(CAPTURE_TIMEOUT)
+    captured = {}
+    for url, data, etag, last_modified in driver.execute_async_script(CAPTURE_SCRIPT, max_bytes) or []:
+        captured[url] = (base64.b64decode(data), {'etag': etag, 'last_modified': last_modified})
+    return captured
+
+
+class BrowserPool:
+    """
+    Un pool de browsere headless refolosite între pagini.
+
+    Driverele sunt pornite la nevoie (cel mult `size`), iar un driver este
+    închis și înlocuit după `max_pages` pagini sau după ce a dat o eroare.
+    `driver_factory` poate fi orice funcție care întoarce un obiect cu
+    interfața unui WebDriver (get, page_source, quit și, pentru captura
+    resurselor, set_script_timeout și execute_async_script).
+    """
+
+    def __init__(self, size=2, max_pages=50, driver_factory=create_firefox_driver):
+        if size < 1:
+            raise ValueError("Pool-ul de browsere trebuie să aibă cel puțin un driver.")
+
+        self.size = size
+        self.max_pages = max_pages
+        self.driver_factory = driver_factory
+
+        self._idle = []
+        self._page_counts = {}
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Întoarce un driver liber, pornind unul nou dacă pool-ul nu e plin."""
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pool-ul de browsere a fost închis.")
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                self._cond.wait()
+
+        # Browser startup is slow, so it happens outside the lock
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._page_counts[id(driver)] = 0
+        return driver
+
+    def release(self, driver, broken=False):
+        """Returnează driverul în pool; îl reciclează dacă e stricat sau uzat."""
+
+        with self._cond:
+            pages = self._page_counts.get(id(driver), 0) + 1
+            retire = broken or self._closed or pages >= self.max_pages
+            if retire:
+                self._page_counts.pop(id(driver), None)
+                self._created -= 1
+            else:
+                self._page_counts[id(driver)] = pages
+                self._idle.append(driver)
+            self._cond.notify()
+
+        if retire:
+            self._quit(driver)
+
+    @contextmanager
+    def driver(self):
+        """Context manager: `with pool.driver() as d: d.get(url)`."""
+
+        driver = self.acquire()
+        try:
+            yield driver
+        except Exception:
+            self.release(driver, broken=True)
+            raise
+        else:
+            self.release(driver)
+
+    def shutdown(self):
+        """Închide toate driverele libere; cele în uz se închid la release."""
+
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for driver in idle:
+                self._page_counts.pop(id(driver), None)
+            self._created -= len(idle)
+            self._cond.notify_all()
+
+        for driver in idle:
+            self._quit(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"[eroare-selenium] Nu am putut închide browserul: {e}")
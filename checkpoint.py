@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+import time
+
+CRAWL_STATE_FILE = "crawl_state.sqlite"
+
+QUEUED = 'queued'
+DONE = 'done'
+FAILED = 'failed'
+
+class CrawlState:
+    """
+    Starea persistentă a unui crawl, păstrată în snapshot (crawl_state.sqlite):
+    frontiera, mulțimea URL-urilor văzute și statusul fiecărui URL.
+
+    Scrierile sunt grupate: commit-ul se face la `commit_every` operații sau
+    la `commit_interval` secunde, deci bucla crawler-ului nu așteaptă discul
+    pentru fiecare pagină. La reluare se pierd cel mult ultimele operații
+    necomise, iar paginile aflate atunci în lucru sunt refăcute.
+    """
+
+    def __init__(self, db_path, commit_every=500, commit_interval=2.0):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, status TEXT NOT NULL, updated REAL)")
+        self._conn.commit()
+
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+            self._conn.commit()
+
+    def queued(self, url):
+        """Înregistrează un URL nou adăugat în frontieră."""
+
+        self._write("INSERT OR IGNORE INTO urls (url, status, updated) VALUES (?, ?, ?)", (url, QUEUED, time.time()))
+
+    def finished(self, url, ok=True):
+        """Marchează un URL ca procesat (DONE) sau eșuat (FAILED)."""
+
+        # An upsert keeps the row (and its rowid), so load() returns URLs in the order they were found
+        self._write("INSERT INTO urls (url, status, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET status = excluded.status, updated = excluded.updated",
+                    (url, DONE if ok else FAILED, time.time()))
+
+    def status(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, retry_failed=True):
+        """
+        Întoarce (toate URL-urile cunoscute, în ordinea descoperirii, URL-urile
+        rămase în frontieră). Cu retry_failed, URL-urile eșuate (ex. o eroare
+        de rețea trecătoare) sunt puse din nou în frontieră.
+        """
+
+        pending_statuses = (QUEUED, FAILED) if retry_failed else (QUEUED,)
+        with self._lock:
+            rows = self._conn.execute("SELECT url, status FROM urls ORDER BY rowid").fetchall()
+        return [url for url, _status in rows], [url for url, status in rows if status in pending_statuses]
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+    def _write(self, sql, params):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._pending += 1
+            if self._pending >= self.commit_every or time.monotonic() - self._last_commit >= self.commit_interval:
+                self._commit()
+
+    def _commit(self):
+        self._conn.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
@@ -1,62 +1,119 @@
 import os
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from downloader import download_page, get_html
-from utils import get_local_page_folder_name 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from async_crawler import AIOHTTP_AVAILABLE, crawl_domain_async
+from downloader import download_page
+from frontier import Frontier
+from metrics import ERRORS, metrics
+from utils import canonicalize_url, get_local_page_folder_name
 
-def crawl_domain(start_url, snapshot_root, use_selenium=True):
+def crawl_domain(start_url, snapshot_root, use_selenium=True, pool=None,
+                 workers=4, per_host_limit=2, host_delay=0.5, state=None, fetch_engine='threads',
+                 seeds=(), host_delays=None, **download_options):
+    """
+    Arhivează toate paginile interne accesibile din start_url.
 
-    visited = set() 
-    to_visit = [start_url] 
-    base_netloc = urlparse(start_url).netloc 
+    Paginile sunt procesate în paralel de `workers` thread-uri, cu cel mult
+    `per_host_limit` cereri simultane și `host_delay` secunde între două
+    cereri către același host. Argumentele suplimentare (ex. manifest, previous)
+    sunt transmise lui download_page. Întoarce mulțimea URL-urilor
+    (normalizate) văzute în timpul crawl-ului.
 
-    while to_visit:
-        url = to_visit.pop(0) 
-        
-        if url.endswith('/'):
-            normalized_url = url
+    Cu `state` (un CrawlState), frontiera și statusul fiecărui URL sunt
+    salvate pe disc; dacă starea conține deja un crawl întrerupt, acesta este
+    continuat fără a descărca din nou paginile terminate.
+
+    `seeds` sunt URL-uri puse în frontieră de la început, pe lângă start_url
+    (ex. cele din sitemap-uri, vezi discovery.py), iar `host_delays` (host ->
+    secunde) înlocuiește host_delay pentru anumite host-uri (ex. Crawl-delay).
+
+    Cu fetch_engine='async' și fără Selenium, crawl-ul rulează pe motorul
+    asyncio (async_crawler.py, necesită aiohttp), unde `workers` înseamnă
+    pagini procesate simultan; altfel se folosesc thread-urile.
+    """
+
+    # Discovered links are canonical: the start URL must share their host key (delays, per-host limit)
+    start_url = canonicalize_url(start_url)
+
+    if fetch_engine == 'async':
+        if use_selenium:
+            print("[crawl] Motorul async funcționează doar fără Selenium; folosesc thread-urile.")
+        elif not AIOHTTP_AVAILABLE:
+            print("[crawl] aiohttp nu este instalat; folosesc thread-urile.")
         else:
-            normalized_url = url + '/'
-            
-        if normalized_url in visited:
-            continue
-        visited.add(normalized_url)
+            return crawl_domain_async(start_url, snapshot_root, workers=workers, per_host_limit=per_host_limit,
+                                      host_delay=host_delay, state=state, seeds=seeds, host_delays=host_delays,
+                                      **download_options)
+
+    frontier = Frontier(per_host_limit=per_host_limit, min_delay=host_delay)
+    for host, delay in (host_delays or {}).items():
+        frontier.set_host_delay(host, delay)
+    base_netloc = urlparse(start_url).netloc
+
+    known_urls, pending_urls = state.load() if state else ([], [])
+    if known_urls:
+        frontier.restore(known_urls, pending_urls)
+        print(f"[crawl] Reiau crawl-ul: {len(known_urls)} URL-uri cunoscute, {len(pending_urls)} rămase în coadă")
+    else:
+        for url in (start_url, *seeds):
+            if frontier.add(url) and state:
+                state.queued(url)
 
+    def process(url):
         print(f"[crawl] Procesez: {url}")
         
         page_folder_name = get_local_page_folder_name(url)
         output_dir_for_page = os.path.join(snapshot_root, page_folder_name)
         
         try:
-
-            download_page(url, output_dir_for_page, snapshot_root, use_selenium=use_selenium)
+            # download_page întoarce și link-urile interne, deci pagina se descarcă o singură dată
+            result = download_page(url, output_dir_for_page, snapshot_root, use_selenium=use_selenium, pool=pool, **download_options)
         except Exception as e:
+            metrics.inc(ERRORS, category='page')
             print(f"[eroare] Nu am putut descărca {url} — {e}")
-            continue
+            return 0
+
+        if not result:
+            print(f"[skip-links] Nu am putut obține HTML pentru {url}")
+            return 0
+
+        _html, _document, internal_links, page_saved = result
 
+        for link in internal_links:
+            # Verifică dacă link-ul este intern (același domeniu); fragmentele (#) sunt deja eliminate
+            if urlparse(link).netloc == base_netloc:
+                if frontier.add(link) and state:
+                    state.queued(link)
+        return 1 if page_saved else 0
+
+    def worker():
+        pages = 0
+        while True:
+            url = frontier.get()
+            if url is None:
+                return pages
+            saved = 0
+            try:
+                saved = process(url)
+                pages += saved
+            finally:
+                if state:
+                    state.finished(url, ok=bool(saved))
+                frontier.task_done(url)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker) for _ in range(workers)]
         try:
+            saved = sum(f.result() for f in futures)
+        except BaseException:
+            frontier.close()
+            raise
 
-            html = get_html(url, use_selenium)
-            if not html:
-                print(f"[skip-links] Nu am putut obține HTML pentru {url}")
-                continue
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            for a in soup.find_all('a', href=True):
-                link = urljoin(url, a['href']) 
-                parsed_link = urlparse(link)
-                
-                # Verifică dacă link-ul este intern (același domeniu) și nu este un fragment (#)
-                if parsed_link.netloc == base_netloc and parsed_link.fragment == '':
-
-                    if link.endswith('/'):
-                        normalized_link = link
-                    else:
-                        normalized_link = link + '/'
-                        
-                    if normalized_link not in visited:
-                        to_visit.append(link)
-        except Exception as e:
-            print(f"[skip-link-extraction] Eroare la extragerea link-urilor din {url} — {e}")
+    if state:
+        state.flush()
 
+    elapsed = time.monotonic() - started
+    print(f"[crawl] {saved} pagini arhivate în {elapsed:.1f}s ({saved / max(elapsed, 1e-9):.2f} pagini/s)")
+    return frontier.seen
@@ -0,0 +1,218 @@
+import gzip
+import os
+import zlib
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+from xml.etree import ElementTree
+import requests
+from downloader import HEADERS, get_session, previous_page_entry
+from metrics import DOWNLOADED_BYTES, ERRORS, metrics
+from utils import canonicalize_url
+
+SITEMAP_TIMEOUT = 30
+MAX_SITEMAP_DEPTH = 4 # Indexuri de sitemap-uri incluse unele în altele
+MAX_SITEMAPS = 1000 # Sitemap-uri citite cel mult pentru un site
+MAX_CRAWL_DELAY = 30 # Un Crawl-delay mai mare este plafonat la atât (secunde)
+SNAPSHOT_TIME_FORMAT = "%Y-%m-%d_%H-%M-%S" # Numele folderelor create de utils.get_timestamp_folder
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+class Discovery:
+    """
+    Rezultatul etapei de descoperire pentru un site:
+
+    - seeds: URL-urile din sitemap-uri, de pus în frontiera crawler-ului;
+    - unchanged: URL-urile al căror <lastmod> este mai vechi decât descărcarea
+      lor din snapshot-ul anterior (preluate de acolo fără nicio cerere);
+    - crawl_delay: pauza cerută de robots.txt (secunde) sau None.
+    """
+
+    def __init__(self):
+        self.seeds = []
+        self.unchanged = set()
+        self.crawl_delay = None
+        self.sitemaps = 0
+
+    def host_delays(self, start_url):
+        """Dicționarul host -> pauză pentru crawl_domain (gol fără Crawl-delay)."""
+
+        if self.crawl_delay is None:
+            return {}
+        return {urlparse(canonicalize_url(start_url)).netloc: self.crawl_delay}
+
+
+def discover(start_url, previous=None, session=None):
+    """
+    Citește robots.txt al site-ului și sitemap-urile declarate acolo (sau
+    /sitemap.xml, dacă nu declară niciunul) și întoarce un Discovery.
+
+    Sitemap-urile sunt citite în flux (inclusiv .gz și indexuri de sitemap-uri
+    incluse unele în altele), fără a fi încărcate întregi în memorie. Doar
+    URL-urile de pe același host cu start_url sunt păstrate. Cu `previous`
+    (manifestul snapshot-ului anterior), paginile nemodificate conform
+    <lastmod> sunt trecute în Discovery.unchanged.
+    """
+
+    session = session or get_session()
+    base_netloc = urlparse(canonicalize_url(start_url)).netloc
+    discovery = Discovery()
+
+    robots = _fetch_robots(start_url, session)
+    sitemap_urls = [urljoin(start_url, '/sitemap.xml')]
+    if robots is not None:
+        delay = robots.crawl_delay(HEADERS['User-Agent'])
+        if delay is not None:
+            discovery.crawl_delay = min(float(delay), MAX_CRAWL_DELAY)
+            print(f"[descoperire] robots.txt cere o pauză de {discovery.crawl_delay}s între cereri")
+        sitemap_urls = robots.site_maps() or sitemap_urls
+
+    previous_time = _snapshot_time(previous) if previous else None
+    seen = set()
+    for sitemap_url in sitemap_urls:
+        for url, lastmod in _iter_sitemap(sitemap_url, session, seen, depth=0):
+            url = canonicalize_url(url)
+            if urlparse(url).netloc != base_netloc:
+                continue
+            discovery.seeds.append(url)
+            if lastmod is not None and previous is not None and _unchanged(previous, url, lastmod, previous_time):
+                discovery.unchanged.add(url)
+    discovery.sitemaps = len(seen)
+
+    if discovery.seeds:
+        print(f"[descoperire] {len(discovery.seeds)} URL-uri din {discovery.sitemaps} sitemap-uri"
+              + (f", {len(discovery.unchanged)} nemodificate după <lastmod>" if previous else ""))
+    return discovery
+
+
+def _fetch_robots(start_url, session):
+    robots_url = urljoin(start_url, '/robots.txt')
+    try:
+        response = session.get(robots_url, timeout=SITEMAP_TIMEOUT)
+    except requests.RequestException as e:
+        print(f"[descoperire] Nu am putut citi {robots_url}: {e}")
+        return None
+    if response.status_code != 200:
+        return None
+    metrics.inc(DOWNLOADED_BYTES, len(response.content), kind='discovery')
+
+    robots = RobotFileParser(robots_url)
+    robots.parse(response.text.splitlines())
+    return robots
+
+def _iter_sitemap(sitemap_url, session, seen, depth):
+    """Generator (URL, lastmod sau None) din sitemap_url și din sitemap-urile incluse de el."""
+
+    if sitemap_url in seen or len(seen) >= MAX_SITEMAPS:
+        return
+    seen.add(sitemap_url)
+
+    nested = []
+    try:
+        with session.get(sitemap_url, timeout=SITEMAP_TIMEOUT, stream=True) as response:
+            if response.status_code != 200:
+                if depth or response.status_code != 404:
+                    print(f"[descoperire] Sitemap indisponibil {sitemap_url}: HTTP {response.status_code}")
+                return
+            reader = _ResponseReader(response.raw)
+            # Gzipped sitemaps (.xml.gz) are recognised by content, whatever the headers say
+            stream = gzip.GzipFile(fileobj=reader) if reader.peek(2) == GZIP_MAGIC else reader
+
+            # Elements already read are dropped from the root, so memory stays flat on huge sitemaps
+            root = None
+            for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+                if root is None:
+                    root = element
+                if event != 'end':
+                    continue
+                tag = _local_name(element.tag)
+                if tag == 'url':
+                    loc, lastmod = _child_text(element, 'loc'), _child_text(element, 'lastmod')
+                    if loc:
+                        yield loc, _parse_lastmod(lastmod)
+                    root.clear()
+                elif tag == 'sitemap':
+                    loc = _child_text(element, 'loc')
+                    if loc:
+                        nested.append(loc)
+                    root.clear()
+            metrics.inc(DOWNLOADED_BYTES, reader.count, kind='discovery')
+    except (requests.RequestException, ElementTree.ParseError, OSError, EOFError, zlib.error) as e:
+        metrics.inc(ERRORS, category='discovery')
+        print(f"[descoperire] Nu am putut citi sitemap-ul {sitemap_url}: {e}")
+        return
+
+    if depth >= MAX_SITEMAP_DEPTH:
+        if nested:
+            print(f"[descoperire] Ignor {len(nested)} sitemap-uri incluse în {sitemap_url} (prea adânc)")
+        return
+    for nested_url in nested:
+        yield from _iter_sitemap(nested_url, session, seen, depth + 1)
+
+
+class _ResponseReader:
+    """Citește în flux răspunsul HTTP (decodat după Content-Encoding) și numără octeții."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+        self._head = b''
+
+    def peek(self, size):
+        if len(self._head) < size:
+            self._head += self.raw.read(size - len(self._head), decode_content=True)
+        return self._head[:size]
+
+    def read(self, size=-1):
+        if self._head:
+            # A short read is fine for both iterparse and GzipFile
+            data, self._head = self._head, b''
+        else:
+            data = self.raw.read(size if size >= 0 else None, decode_content=True)
+        self.count += len(data)
+        return data
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _child_text(element, name):
+    for child in element:
+        if _local_name(child.tag) == name:
+            return (child.text or '').strip() or None
+    return None
+
+def _parse_lastmod(value):
+    """Data <lastmod> (format W3C) ca datetime UTC sau None dacă lipsește sau e invalidă."""
+
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if len(value) <= len('YYYY-MM-DD'):
+        # A bare date may mean any moment of that day: take its end
+        parsed += timedelta(days=1)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def _snapshot_time(previous):
+    """Momentul începerii snapshot-ului anterior, din numele folderului lui (sau None)."""
+
+    name = os.path.basename(os.path.normpath(previous.snapshot_root))
+    try:
+        # Folder names are in local time
+        return datetime.strptime(name, SNAPSHOT_TIME_FORMAT).astimezone(timezone.utc)
+    except ValueError:
+        return None
+
+def _unchanged(previous, url, lastmod, previous_time):
+    entry = previous_page_entry(previous, url)
+    if entry is None:
+        return False
+    # Pages record when they were fetched; older manifests fall back to the snapshot's start
+    fetched = entry.get('fetched')
+    fetched_time = datetime.fromtimestamp(fetched, timezone.utc) if fetched else previous_time
+    return fetched_time is not None and lastmod <= fetched_time
@@ -1,182 +1,554 @@
 import os
+import shutil
+import hashlib
+import logging
+import threading
+import time
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options as FirefoxOptions 
-from selenium.webdriver.firefox.service import Service as FirefoxService 
-import hashlib 
-from utils import get_local_page_folder_name, get_local_page_path 
-
-GECKO_DRIVER_PATH = "/usr/local/bin/geckodriver" 
-
-def get_html(url, use_selenium=True):
-
-    if not use_selenium:
-
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Firefox/126.0', 
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5,ro;q=0.3', 
-            'DNT': '1', 
-            'Upgrade-Insecure-Requests': '1'
-        }
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urldefrag, urljoin, urlparse
+from asset_store import AssetStore, STORE_DIR_NAME, NOT_MODIFIED
+from browser_pool import GECKO_DRIVER_PATH, capture_loaded_resources, create_firefox_driver
+from fetch_mode import AUTO, RenderDecisions, needs_browser
+from html_rewriter import parse_document
+from metrics import DOWNLOADED_BYTES, ERRORS, PAGES, STAGE_SECONDS, metrics
+from packfile import read_snapshot_file
+from page_store import PageStore, write_page_ref
+from utils import canonicalize_url, get_local_page_folder_name, get_local_page_path, write_precompressed
+
+logger = logging.getLogger(__name__)
+
+# Same headers for pages and resources, so the origin sees a single consistent client
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Firefox/126.0',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5,ro;q=0.3',
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+RESOURCE_WORKERS = 8 # Resurse descărcate în paralel pentru o pagină
+HTTP_POOL_SIZE = 32 # Conexiuni keep-alive păstrate per host
+PARSER_ENGINE = 'stream' # 'stream' (tokenizer, fără arbore) sau 'bs4' (BeautifulSoup)
+CAPTURE_BROWSER_RESOURCES = True # În modul Selenium, resursele sunt preluate din browser, nu descărcate din nou
+DEDUP_PAGES = True # Paginile sunt păstrate o singură dată per domeniu, comprimate, în _pages/ (vezi page_store.py)
+
+DOWNLOADABLE_FILE_EXTENSIONS = [
+    '.pdf', '.zip', '.rar', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.mp4', '.mp3', '.avi', '.mov',
+    '.txt', '.csv', '.xml', '.json', '.ico', '.webp', '.woff', '.woff2', '.ttf', '.otf'
+]
+
+# Per URL prefix memory of which pages need a browser (use_selenium='auto')
+_render_decisions = RenderDecisions()
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Întoarce sesiunea HTTP comună (keep-alive, pool de conexiuni, retry)."""
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504],
+                          allowed_methods=['GET', 'HEAD'])
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+def conditional_headers(previous):
+    """Anteturile If-None-Match / If-Modified-Since pentru o intrare din manifest."""
+
+    headers = {}
+    if previous:
+        if previous.get('etag'):
+            headers['If-None-Match'] = previous['etag']
+        if previous.get('last_modified'):
+            headers['If-Modified-Since'] = previous['last_modified']
+    return headers
+
+def _error_category(error):
+    return 'http' if isinstance(error, requests.exceptions.HTTPError) else 'network'
+
+def _store_validators(response, validators):
+    if validators is not None:
+        validators['etag'] = response.headers.get('ETag')
+        validators['last_modified'] = response.headers.get('Last-Modified')
+
+def get_html(url, use_selenium=True, pool=None, previous=None, validators=None, capture=None):
+    """
+    Întoarce HTML-ul paginii sau None la eroare.
+
+    `use_selenium` poate fi True, False sau 'auto'. În modul 'auto' pagina se
+    descarcă întâi cu requests și trece prin Selenium doar dacă pare randată
+    din JavaScript (vezi fetch_mode.needs_browser); prefixele de URL pentru
+    care browserul s-a dovedit necesar sar direct la Selenium.
+
+    `previous` este intrarea paginii din manifestul snapshot-ului anterior:
+    cererea devine condițională și funcția întoarce NOT_MODIFIED dacă serverul
+    răspunde 304. Dacă este dat, dicționarul `validators` primește ETag-ul și
+    Last-Modified-ul răspunsului. În modul Selenium acestea sunt obținute
+    printr-o cerere HEAD înainte de a porni browserul.
+
+    Dacă pagina este randată în browser și `capture` este un dicționar, el
+    primește resursele încărcate de browser (vezi capture_loaded_resources).
+    """
+
+    headers = conditional_headers(previous)
+
+    auto = use_selenium == AUTO
+    if auto and _render_decisions.browser_decided(url):
+        auto = False
+
+    if not use_selenium or auto:
         try:
-            response = requests.get(url, timeout=15, headers=headers) 
-            response.raise_for_status() 
-            return response.text
+            response = get_session().get(url, timeout=15, headers=headers)
+            if response.status_code == 304 and headers:
+                return NOT_MODIFIED
+            response.raise_for_status()
+            metrics.inc(DOWNLOADED_BYTES, len(response.content), kind='page')
+            _store_validators(response, validators)
+            html = response.text
         except requests.exceptions.RequestException as e:
+            metrics.inc(ERRORS, category=_error_category(e))
             print(f"[eroare-requests] Nu am putut descărca {url}: {e}")
             return None
 
-    # Selenium configuration for Firefox
-    options = FirefoxOptions() 
-    options.headless = True # Run browser in invisible mode
-    options.add_argument("--window-size=1920,1080") 
+        if not auto:
+            return html
+        needs = needs_browser(html)
+        _render_decisions.record(url, needs)
+        if not needs:
+            return html
+        print(f"[auto] {url} pare randată din JavaScript; o descarc cu Selenium.")
+
+    elif headers or validators is not None:
+        # A browser render cannot be conditional, so probe cheaply first
+        try:
+            response = get_session().head(url, timeout=10, headers=headers, allow_redirects=True)
+            if response.status_code == 304 and headers:
+                return NOT_MODIFIED
+            if response.ok:
+                _store_validators(response, validators)
+        except requests.exceptions.RequestException as e:
+            print(f"[eroare-requests] Cererea HEAD pentru {url} a eșuat: {e}")
+
+    # Without a pool, fall back to a one-off browser for this URL
+    if pool is None:
+        driver = None
+        try:
+            driver = create_firefox_driver(GECKO_DRIVER_PATH)
+            return _render(driver, url, capture)
+        except Exception as e:
+            metrics.inc(ERRORS, category='selenium')
+            print(f"[eroare-selenium] Nu am putut descărca {url} cu Selenium: {e}")
+            return None
+        finally:
+            if driver:
+                driver.quit()
 
-    driver = None
     try:
-        service = FirefoxService(executable_path=GECKO_DRIVER_PATH) 
-        driver = webdriver.Firefox(service=service, options=options) 
-        driver.get(url)
-        html = driver.page_source
-        return html
+        with pool.driver() as driver:
+            return _render(driver, url, capture)
     except Exception as e:
+        metrics.inc(ERRORS, category='selenium')
         print(f"[eroare-selenium] Nu am putut descărca {url} cu Selenium: {e}")
         return None
-    finally:
-        if driver:
-            driver.quit() 
 
-def download_page(url, output_dir, snapshot_root, use_selenium=True):
+def _render(driver, url, capture):
+    driver.get(url)
+    html = driver.page_source
+    metrics.inc(DOWNLOADED_BYTES, len(html.encode('utf-8')), kind='page')
+    if capture is not None:
+        try:
+            captured = capture_loaded_resources(driver)
+            metrics.inc(DOWNLOADED_BYTES, sum(len(data) for data, _validators in captured.values()), kind='captured')
+            capture.update(captured)
+        except Exception as e:
+            metrics.inc(ERRORS, category='capture')
+            print(f"[captură] Nu am putut prelua resursele încărcate de browser pentru {url}: {e}")
+    return html
+
+def write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+def download_resource(resource_url, local_path, kind="resursă", previous=None, validators=None):
+    """
+    Descarcă un fișier în local_path prin sesiunea comună; întoarce True la succes.
+
+    Cu `previous` (intrarea din manifestul anterior) cererea este condițională
+    și întoarce NOT_MODIFIED la 304; `validators` primește ETag/Last-Modified.
+    """
+
+    headers = conditional_headers(previous)
+    try:
+        with get_session().get(resource_url, timeout=10, stream=True, headers=headers) as r:
+            if r.status_code == 304 and headers:
+                return NOT_MODIFIED
+            r.raise_for_status()
+            _store_validators(r, validators)
+            size = 0
+            with open(local_path, 'wb') as f:
+                for chunk in r.iter_content(chunk_size=8192):
+                    f.write(chunk)
+                    size += len(chunk)
+            metrics.inc(DOWNLOADED_BYTES, size, kind='resource')
+        return True
+    except requests.exceptions.RequestException as e:
+        metrics.inc(ERRORS, category=_error_category(e))
+        print(f"[skip-{kind}] Could not download {resource_url}: {e}")
+    except Exception as e:
+        metrics.inc(ERRORS, category='resource')
+        print(f"[skip-{kind}] General error downloading {resource_url}: {e}")
+    return False
+
+def reuse_previous_page(url, entry, previous, output_dir, snapshot_root, manifest, search_index=None):
+    """
+    Copiază în snapshot-ul curent o pagină nemodificată din snapshot-ul anterior.
+
+    Cu DEDUP_PAGES, snapshot-ul curent primește doar o referință spre pagina
+    din depozitul comun (o pagină veche, salvată complet, este mutată în
+    depozit cu link-uri relative). Altfel fișierul este legat (hard link) dacă
+    nu conține link-uri spre versiunea anterioară sau rescris spre snapshot-ul
+    curent. Întoarce tuplul lui download_page sau None dacă pagina veche lipsește.
+    """
+
+    previous_path = os.path.join(previous.snapshot_root, entry['page'], 'index.html')
+    page_filename = os.path.join(output_dir, 'index.html')
+    # The previous snapshot may be a loose directory, a packed snapshot or a page store reference
+    data = read_snapshot_file(previous.snapshot_root, os.path.join(entry['page'], 'index.html'))
+    if data is None:
+        return None
+    html = data.decode('utf-8')
+
+    site_name, previous_version = os.path.normpath(previous.snapshot_root).split(os.sep)[-2:]
+    version_name = os.path.normpath(snapshot_root).split(os.sep)[-1]
+    old_prefix = f"/view/{site_name}/{previous_version}/"
+
+    try:
+        if DEDUP_PAGES:
+            # Every page sits at <folder>/index.html, so "../" reaches the other pages and _store
+            if old_prefix in html:
+                html = html.replace(old_prefix, "../")
+                data = html.encode('utf-8')
+            write_page_ref(page_filename, PageStore.for_snapshot(snapshot_root).put(data))
+        else:
+            if os.path.exists(page_filename):
+                os.remove(page_filename)
+            if old_prefix in html or not os.path.exists(previous_path):
+                html = html.replace(old_prefix, f"/view/{site_name}/{version_name}/")
+                with open(page_filename, 'w', encoding='utf-8') as f:
+                    f.write(html)
+            else:
+                try:
+                    os.link(previous_path, page_filename)
+                except OSError:
+                    shutil.copyfile(previous_path, page_filename)
+            write_precompressed(page_filename)
+    except OSError as e:
+        metrics.inc(ERRORS, category='save')
+        print(f"[eroare] Could not save page {url} to {page_filename}: {e}")
+        return None
+
+    if manifest is not None:
+        manifest.copy_from(previous, url)
+        for asset_url in entry.get('assets', []):
+            manifest.copy_from(previous, asset_url)
+
+    if search_index is not None:
+        search_index.copy_page(site_name, previous_version, entry['page'],
+                               version_name, os.path.basename(os.path.normpath(output_dir)))
+
+    metrics.inc(PAGES, result='unchanged')
+    print(f"[=] Page unchanged since previous snapshot: {page_filename}")
+    return html, None, entry.get('links', []), True
+
+def download_page(url, output_dir, snapshot_root, use_selenium=True, pool=None,
+                  manifest=None, previous=None, parser=PARSER_ENGINE, search_index=None, unchanged=None):
+    """
+    Descarcă o pagină cu resursele ei și o salvează în output_dir.
+
+    Returnează un tuplu (html, document, internal_links, saved), unde document
+    este documentul parsat (vezi html_rewriter; `document.soup` există doar
+    pentru motorul 'bs4'), internal_links sunt URL-urile absolute ale paginilor
+    interne găsite, iar saved este False dacă pagina nu a putut fi scrisă pe
+    disc; sau None dacă pagina nu a putut fi obținută. Dacă este
+    dat, `pool` (un BrowserPool) furnizează browserul folosit în modul Selenium.
+
+    `manifest` (un Manifest) primește ETag-ul, Last-Modified-ul și hash-ul
+    paginii și al resurselor ei. Cu `previous` (manifestul snapshot-ului
+    anterior), cererile sunt condiționale: o pagină nemodificată este
+    preluată din snapshot-ul anterior (document este atunci None), iar resursele
+    nemodificate sunt refolosite din depozit fără a fi descărcate.
+
+    Dacă este dat, `search_index` (un SearchIndex) primește titlul și textul
+    vizibil al paginii pentru căutarea full-text.
+
+    `unchanged` conține URL-urile pe care sitemap-ul le arată nemodificate
+    față de snapshot-ul anterior (vezi discovery.py); ele sunt preluate de
+    acolo fără nicio cerere.
+
+    Când pagina trece prin browser (și CAPTURE_BROWSER_RESOURCES este activ),
+    resursele din pagină deja încărcate de browser sunt salvate direct în
+    depozit; requests descarcă doar ce lipsește.
+    """
 
     os.makedirs(output_dir, exist_ok=True)
-    
-    # Directory for this page's resources
-    resources_dir = os.path.join(output_dir, "_resources")
-    os.makedirs(resources_dir, exist_ok=True)
+
+    # Resources go to the domain's shared, content-addressed store
+    store = AssetStore.for_snapshot(snapshot_root)
+
+    previous_entry = previous_page_entry(previous, url)
+    page_validators = {} if manifest is not None else None
+    captured = {} if use_selenium and CAPTURE_BROWSER_RESOURCES else None
+
+    if unchanged and previous_entry and url in unchanged:
+        result = reuse_previous_page(url, previous_entry, previous, output_dir, snapshot_root, manifest, search_index)
+        if result:
+            return result
 
     try:
-        html = get_html(url, use_selenium)
+        with metrics.timer(STAGE_SECONDS, stage='fetch'):
+            html = get_html(url, use_selenium, pool=pool, previous=previous_entry, validators=page_validators,
+                            capture=captured)
+        if html == NOT_MODIFIED:
+            result = reuse_previous_page(url, previous_entry, previous, output_dir, snapshot_root,
+                                         manifest, search_index)
+            if result:
+                return result
+            with metrics.timer(STAGE_SECONDS, stage='fetch'):
+                html = get_html(url, use_selenium, pool=pool, validators=page_validators, capture=captured)
         if not html:
+            metrics.inc(PAGES, result='failed')
             print(f"[skip] Nu am putut obține HTML pentru {url}. Sărit peste descărcare.")
-            return
+            return None
     except Exception as e:
+        metrics.inc(PAGES, result='failed')
+        metrics.inc(ERRORS, category='page')
         print(f"[eroare] Nu am putut descărca {url}: {e}")
+        return None
+
+    document, downloads, internal_links = prepare_page(url, html, snapshot_root, parser)
+
+    # Download all resources in parallel, then rewrite the document.
+    # URLs already in the store (from this or another page) are not fetched again
+    def fetch_into_store(resource_url, extension, kind):
+        previous_asset, previous_name = previous_asset_entry(previous, store, resource_url)
+
+        validators = {}
+        if captured and resource_url in captured:
+            # Already loaded by the browser: no second request
+            data, captured_validators = captured[resource_url]
+            validators = {key: value for key, value in captured_validators.items() if value}
+            download = lambda u, path: write_bytes(path, data)
+        else:
+            download = lambda u, path: download_resource(u, path, kind, previous=previous_asset, validators=validators)
+        stored_name = store.fetch(resource_url, extension, download, previous_name=previous_name)
+
+        record_asset(manifest, previous, resource_url, stored_name, previous_name, validators)
+        return stored_name
+
+    stored_names = {}
+    if downloads:
+        with metrics.timer(STAGE_SECONDS, stage='resources'), \
+             ThreadPoolExecutor(max_workers=min(RESOURCE_WORKERS, len(downloads))) as executor:
+            futures = {
+                resource_url: executor.submit(fetch_into_store, resource_url, extension, kind)
+                for resource_url, (extension, kind, _refs) in downloads.items()
+            }
+        stored_names = {resource_url: future.result() for resource_url, future in futures.items()}
+
+    link_resources(document, downloads, stored_names, snapshot_root)
+    return save_page(url, html, document, internal_links, downloads, output_dir, snapshot_root,
+                     manifest=manifest, search_index=search_index, page_validators=page_validators)
+
+def previous_page_entry(previous, url):
+    """Intrarea paginii din manifestul anterior (doar dacă e o pagină)."""
+
+    entry = previous.get(url) if previous else None
+    return entry if entry and entry.get('type') == 'page' else None
+
+def previous_asset_entry(previous, store, resource_url):
+    """(intrarea din manifestul anterior, numele din depozit) pentru o resursă încă prezentă."""
+
+    entry = previous.get(resource_url) if previous else None
+    name = entry.get('asset') if entry else None
+    if not store.exists(name):
+        return None, None
+    return entry, name
+
+def record_asset(manifest, previous, resource_url, stored_name, previous_name, validators):
+    if not stored_name or manifest is None:
         return
+    if stored_name == previous_name and not validators:
+        manifest.copy_from(previous, resource_url)
+    else:
+        manifest.record(resource_url, type='asset', asset=stored_name,
+                        hash=os.path.splitext(stored_name)[0], **validators)
 
-    soup = BeautifulSoup(html, 'html.parser')
-    base_netloc = urlparse(url).netloc 
-
-    DOWNLOADABLE_FILE_EXTENSIONS = [
-        '.pdf', '.zip', '.rar', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', 
-        '.jpg', '.jpeg', '.png', '.gif', '.svg', '.mp4', '.mp3', '.avi', '.mov', 
-        '.txt', '.csv', '.xml', '.json', '.ico', '.webp', '.woff', '.woff2', '.ttf', '.otf'
-    ]
-
-    # --- 1. Download and modify paths for resources (img, script, link) ---
-    for tag in soup.find_all(['img', 'script', 'link']):
-        attr = 'src' if tag.name != 'link' else 'href'
-        if tag.has_attr(attr):
-            resource_url = urljoin(url, tag[attr]) # Transform to absolute URL
-            parsed_resource_url = urlparse(resource_url)
-
-            file_extension = os.path.splitext(parsed_resource_url.path)[1].lower()
-            
-            if parsed_resource_url.scheme in ['http', 'https'] and parsed_resource_url.netloc and \
-               (parsed_resource_url.path != '/' or parsed_resource_url.query or file_extension):
-                
-                # If no extension, try to guess or use a fallback
-                if not file_extension:
-                    if tag.name == 'script': file_extension = '.js'
-                    elif tag.name == 'link' and tag.has_attr('rel') and 'stylesheet' in tag['rel']: file_extension = '.css'
-                    elif tag.name == 'img': file_extension = '.png' 
-                    else: file_extension = '.bin' 
-
-                # Use a hash of the full URL for uniqueness
-                unique_filename = hashlib.md5(resource_url.encode('utf-8')).hexdigest() + file_extension
-                local_resource_path = os.path.join(resources_dir, unique_filename)
-                
-                try:
-                    # Download the resource
-                    r = requests.get(resource_url, timeout=10, stream=True)
-                    r.raise_for_status()
-                    with open(local_resource_path, 'wb') as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-                    # Modify the HTML attribute to point to the local resource
-                    # The path is relative to the current page's directory
-                    tag[attr] = os.path.join("_resources", unique_filename).replace(os.sep, '/') 
-
-                except requests.exceptions.RequestException as e:
-                    print(f"[skip-resursă] Could not download {resource_url}: {e}")
-                    pass 
-                except Exception as e:
-                    print(f"[skip-resursă] General error downloading {resource_url}: {e}")
-                    pass
-            else:
-                print(f"[DEBUG-RESOURCE] Resource ignored (not a specific file or has empty path): {resource_url}")
+def snapshot_names(snapshot_root):
+    """(numele site-ului, versiunea) din calea archive/<site>/<versiune>."""
+
+    parts = os.path.normpath(snapshot_root).split(os.sep)
+    return parts[-2], parts[-1]
+
+def prepare_page(url, html, snapshot_root, parser=PARSER_ENGINE):
+    """
+    Parsează pagina, rescrie link-urile interne spre /view și adună resursele.
+
+    Întoarce (document, downloads, internal_links), unde downloads este
+    dicționarul URL absolut -> (extensie, tip, [referințe din document]).
+    """
+
+    with metrics.timer(STAGE_SECONDS, stage='parse'):
+        document = parse_document(html, parser)
+        refs = list(document.refs())
+    with metrics.timer(STAGE_SECONDS, stage='rewrite'):
+        downloads, internal_links = _rewrite_links(url, document, refs, snapshot_root)
+    return document, downloads, internal_links
+
+def _rewrite_links(url, document, refs, snapshot_root):
+    base_netloc = urlparse(canonicalize_url(url)).netloc
+    # Checked once per page: debug calls in the loops cost nothing when disabled
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    # Resources to fetch: absolute URL -> (file extension, kind, [refs])
+    downloads = {}
+
+    def schedule(resource_url, extension, kind, ref):
+        entry = downloads.setdefault(resource_url, (extension, kind, []))
+        entry[2].append(ref)
+
+    # --- 1. Collect resources (img, script, link) ---
+    for ref in refs:
+        if ref.tag == 'a':
+            continue
+        resource_url = urljoin(url, ref.value) # Transform to absolute URL
+        parsed_resource_url = urlparse(resource_url)
+
+        file_extension = os.path.splitext(parsed_resource_url.path)[1].lower()
+
+        if parsed_resource_url.scheme in ['http', 'https'] and parsed_resource_url.netloc and \
+           (parsed_resource_url.path != '/' or parsed_resource_url.query or file_extension):
+
+            # If no extension, try to guess or use a fallback
+            if not file_extension:
+                if ref.tag == 'script': file_extension = '.js'
+                elif ref.tag == 'link' and 'stylesheet' in ref.rel: file_extension = '.css'
+                elif ref.tag == 'img': file_extension = '.png'
+                else: file_extension = '.bin'
+
+            schedule(resource_url, file_extension, "resursă", ref)
+        elif debug:
+            logger.debug("Resource ignored (not a specific file or has empty path): %s", resource_url)
 
 
     # --- 2. Modify internal links (<a> tags) ---
-    for a_tag in soup.find_all('a', href=True):
-        original_href = a_tag['href']
-        full_link_url = urljoin(url, original_href) 
-        parsed_link = urlparse(full_link_url)
+    # The crawler queues these directly, so the page is never fetched twice
+    internal_links = []
+    seen_links = set()
 
-        if parsed_link.netloc == base_netloc and not parsed_link.fragment:
+    for a_ref in refs:
+        if a_ref.tag != 'a':
+            continue
+        original_href = a_ref.value
+        if original_href.startswith('#'):
+            continue # Anchor within the same page: it already works offline
+        full_link_url, fragment = urldefrag(urljoin(url, original_href))
+        # Variants of the same URL (query order, utm_*, index.html...) are one page
+        canonical_link_url = canonicalize_url(full_link_url)
+        parsed_link = urlparse(canonical_link_url)
+
+        if parsed_link.netloc == base_netloc:
             path_extension = os.path.splitext(parsed_link.path)[1].lower()
-            
+
             if path_extension in DOWNLOADABLE_FILE_EXTENSIONS:
-                
-                print(f"[DEBUG-LINK] Link to downloadable file: {original_href}")
-                
-                
-                unique_filename = hashlib.md5(full_link_url.encode('utf-8')).hexdigest() + path_extension
-                local_file_path = os.path.join(resources_dir, unique_filename)
-                
-                try:
-                    r = requests.get(full_link_url, timeout=10, stream=True)
-                    r.raise_for_status()
-                    with open(local_file_path, 'wb') as f:
-                        for chunk in r.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                    
-
-                    a_tag['href'] = os.path.join("_resources", unique_filename).replace(os.sep, '/')
-                    print(f"[DEBUG-LINK] Rewrote file link: {original_href} -> {a_tag['href']}")
-                except requests.exceptions.RequestException as e:
-                    print(f"[skip-fisier] Could not download file {full_link_url}: {e}")
-                    pass 
-                except Exception as e:
-                    print(f"[skip-fisier] General error downloading file {full_link_url}: {e}")
-                    pass
+                if debug:
+                    logger.debug("Link to downloadable file: %s", original_href)
+
+                schedule(full_link_url, path_extension, "fisier", a_ref)
             else:
                 # This link is to another internal HTML page
-                print(f"[DEBUG-LINK] Link to another HTML page: {original_href}")
-                
-                parts = snapshot_root.split(os.sep)
-                site_name = parts[-2]
-                version_name = parts[-1]
+                if canonical_link_url not in seen_links:
+                    seen_links.add(canonical_link_url)
+                    internal_links.append(canonical_link_url)
 
                 # Get the folder name for the target page
-                target_page_folder_name = get_local_page_folder_name(full_link_url)
+                target_page_folder_name = get_local_page_folder_name(canonical_link_url)
+
+                # Relative to /view/<site>/<version>/<folder>/index.html: the saved page
+                # does not depend on the snapshot version, so unchanged pages dedup across snapshots
+                flask_relative_url = f"../{target_page_folder_name}/index.html" + (f"#{fragment}" if fragment else "")
+
+                # Replace the original link with the Flask-friendly URL
+                document.set(a_ref, flask_relative_url)
+                if debug:
+                    logger.debug("Rewrote page link: %s -> %s", original_href, flask_relative_url)
+        elif debug and parsed_link.netloc != base_netloc:
+            logger.debug("External link left unchanged: %s", original_href)
+
+    return downloads, internal_links
+
+def link_resources(document, downloads, stored_names, snapshot_root):
+    """Rescrie referințele resurselor salvate spre fișierele din depozit."""
+
+    with metrics.timer(STAGE_SECONDS, stage='rewrite'):
+        for resource_url, stored_name in stored_names.items():
+            if not stored_name:
+                continue
+            _extension, _kind, resource_refs = downloads[resource_url]
+            # /view/<site>/<version>/_store/ serves the domain's shared store
+            local_href = f"../{STORE_DIR_NAME}/{stored_name}"
+            for ref in resource_refs:
+                document.set(ref, local_href)
 
-                flask_absolute_url = f"/view/{site_name}/{version_name}/{target_page_folder_name}/index.html"
-                
-                # Replace the original link with the Flask-friendly absolute URL
-                a_tag['href'] = flask_absolute_url
-                print(f"[DEBUG-LINK] Rewrote page link: {original_href} -> {a_tag['href']}")
-        elif parsed_link.netloc != base_netloc:
-            print(f"[DEBUG-LINK] External link left unchanged: {original_href}")
-            pass 
+def save_page(url, html, document, internal_links, downloads, output_dir, snapshot_root,
+              manifest=None, search_index=None, page_validators=None):
+    """Scrie pagina rescrisă și o înregistrează în indexul de căutare și în manifest."""
+
+    site_name, version_name = snapshot_names(snapshot_root)
 
     # Save the modified HTML of the page
     page_filename = os.path.join(output_dir, 'index.html')
     try:
-        with open(page_filename, 'w', encoding='utf-8') as f:
-            f.write(str(soup))
+        with metrics.timer(STAGE_SECONDS, stage='write'):
+            if DEDUP_PAGES:
+                name = PageStore.for_snapshot(snapshot_root).put(document.render().encode('utf-8'))
+                write_page_ref(page_filename, name)
+            else:
+                with open(page_filename, 'w', encoding='utf-8') as f:
+                    f.write(document.render())
+                write_precompressed(page_filename)
         print(f"[✓] Page saved: {page_filename}")
     except Exception as e:
+        metrics.inc(PAGES, result='failed')
+        metrics.inc(ERRORS, category='save')
         print(f"[eroare] Could not save page {url} to {page_filename}: {e}")
+        # The links were found all the same: the crawl goes on, but the page is marked failed
+        return html, document, internal_links, False
+    metrics.inc(PAGES, result='saved')
+
+    page_folder = os.path.basename(os.path.normpath(output_dir))
+    if search_index is not None:
+        try:
+            with metrics.timer(STAGE_SECONDS, stage='index'):
+                search_index.add_page(site_name, version_name, page_folder, url, document.title, document.text())
+        except Exception as e:
+            metrics.inc(ERRORS, category='search')
+            print(f"[eroare-căutare] Nu am putut indexa {url}: {e}")
+
+    if manifest is not None:
+        manifest.record(url, type='page', page=page_folder, fetched=int(time.time()),
+                        hash=hashlib.sha256(html.encode('utf-8')).hexdigest(),
+                        links=internal_links, assets=list(downloads), **(page_validators or {}))
+
+    return html, document, internal_links, True
@@ -0,0 +1,73 @@
+import re
+import threading
+from urllib.parse import urlparse
+
+AUTO = 'auto'
+
+MIN_TEXT_CHARS = 200 # Sub atât text vizibil, pagina pare randată din JavaScript
+MIN_LINKS = 2
+DECISION_SAMPLES = 2 # Observații identice necesare pentru a memora decizia unui prefix
+
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style|template)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_LINK_RE = re.compile(r'<a\s[^>]*href\s*=', re.IGNORECASE)
+_NOSCRIPT_RE = re.compile(r'<noscript\b[^>]*>(.*?)</noscript\s*>', re.IGNORECASE | re.DOTALL)
+_NOSCRIPT_WARNING_RE = re.compile(r'enable\s+javascript|javascript\s+(is\s+)?(required|disabled)|requires\s+javascript', re.IGNORECASE)
+# Empty mount points of the usual single-page-app frameworks
+_SPA_ROOT_RE = re.compile(
+    r'<(div|main)\s[^>]*id\s*=\s*["\']?(root|app|__next|__nuxt|svelte)["\']?[^>]*>\s*</\1>'
+    r'|<app-root[^>]*>\s*</app-root>|\bng-app\b|data-reactroot',
+    re.IGNORECASE)
+
+def needs_browser(html):
+    """
+    Euristici ieftine (doar regex, fără parsare) care spun dacă o pagină
+    descărcată cu requests trebuie randată în browser: corp gol, avertisment
+    <noscript>, rădăcină goală de SPA sau foarte puține link-uri și puțin text.
+    """
+
+    if not html or not html.strip():
+        return True
+    if _SPA_ROOT_RE.search(html):
+        return True
+    for noscript in _NOSCRIPT_RE.findall(html):
+        if _NOSCRIPT_WARNING_RE.search(noscript):
+            return True
+
+    text = _TAG_RE.sub(' ', _SCRIPT_STYLE_RE.sub(' ', html))
+    text_chars = len(''.join(text.split()))
+    return len(_LINK_RE.findall(html)) < MIN_LINKS and text_chars < MIN_TEXT_CHARS
+
+
+def url_prefix(url):
+    """Cheia sub care se memorează decizia: host + primul segment din cale."""
+
+    parsed = urlparse(url)
+    directory = parsed.path.rsplit('/', 1)[0] # fără numele fișierului final
+    first = directory.strip('/').split('/', 1)[0]
+    return f"{parsed.netloc.lower()}/{first}"
+
+
+class RenderDecisions:
+    """
+    Memorează, per prefix de URL, dacă paginile au nevoie de browser.
+
+    După DECISION_SAMPLES observații consecutive că un prefix are nevoie de
+    browser, paginile lui sar direct la Selenium, fără descărcarea de probă.
+    """
+
+    def __init__(self, samples=DECISION_SAMPLES):
+        self.samples = samples
+        self._observations = {} # prefix -> (needs_browser, număr de observații consecutive)
+        self._lock = threading.Lock()
+
+    def browser_decided(self, url):
+        with self._lock:
+            needs, count = self._observations.get(url_prefix(url), (False, 0))
+        return needs and count >= self.samples
+
+    def record(self, url, needs):
+        key = url_prefix(url)
+        with self._lock:
+            previous_needs, count = self._observations.get(key, (needs, 0))
+            self._observations[key] = (needs, count + 1 if previous_needs == needs else 1)
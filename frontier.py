@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+from utils import url_key
+
+def normalize_url(url):
+    """Cheia de deduplicare: URL-ul canonic cu slash final (vezi utils.UrlCanonicalizer)."""
+
+    return url_key(url)
+
+
+class Frontier:
+    """
+    Coada de URL-uri a crawler-ului, sigură pentru mai multe thread-uri.
+
+    URL-urile sunt deduplicate la adăugare, grupate pe host, iar get() respectă
+    o limită de cereri simultane per host și o pauză minimă între două cereri
+    către același host (min_delay sau cea dată cu set_host_delay).
+    """
+
+    def __init__(self, per_host_limit=2, min_delay=0.5, key=normalize_url):
+        self.per_host_limit = per_host_limit
+        self.min_delay = min_delay
+        self.key = key
+
+        self.seen = set()
+        self._queues = {} # host -> deque de URL-uri
+        self._hosts = deque() # ordinea round-robin a host-urilor
+        self._active = {} # host -> cereri în curs
+        self._last_start = {} # host -> momentul ultimei cereri
+        self._delays = {} # host -> pauză proprie (ex. Crawl-delay din robots.txt), în locul lui min_delay
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def add(self, url):
+        """Adaugă URL-ul dacă nu a mai fost văzut; întoarce True dacă a fost adăugat."""
+
+        key = self.key(url)
+        host = urlparse(url).netloc
+        with self._cond:
+            if key in self.seen:
+                return False
+            self.seen.add(key)
+            if host not in self._queues:
+                self._queues[host] = deque()
+                self._hosts.append(host)
+            self._queues[host].append(url)
+            self._cond.notify()
+        return True
+
+    def set_host_delay(self, host, delay):
+        """Pauza minimă între două cereri către host; niciodată sub min_delay."""
+
+        with self._cond:
+            self._delays[host] = max(delay, self.min_delay)
+            self._cond.notify_all()
+
+    def restore(self, seen_urls, pending_urls):
+        """Reface frontiera unui crawl întrerupt: URL-urile văzute și cele încă în coadă."""
+
+        with self._cond:
+            self.seen.update(self.key(url) for url in seen_urls)
+            for url in pending_urls:
+                host = urlparse(url).netloc
+                if host not in self._queues:
+                    self._queues[host] = deque()
+                    self._hosts.append(host)
+                self._queues[host].append(url)
+            self._cond.notify_all()
+
+    def get(self):
+        """
+        Așteaptă și întoarce următorul URL care poate fi descărcat acum.
+
+        Întoarce None când coada este goală și nicio pagină nu mai este în lucru
+        (deci nu mai pot apărea link-uri noi) sau după close().
+        """
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+
+                now = time.monotonic()
+                wait = None
+                for _ in range(len(self._hosts)):
+                    host = self._hosts[0]
+                    self._hosts.rotate(-1)
+
+                    if self._active.get(host, 0) >= self.per_host_limit:
+                        continue
+                    ready_at = self._last_start.get(host, float('-inf')) + self._delays.get(host, self.min_delay)
+                    if ready_at > now:
+                        wait = ready_at - now if wait is None else min(wait, ready_at - now)
+                        continue
+
+                    url = self._queues[host].popleft()
+                    if not self._queues[host]:
+                        del self._queues[host]
+                        self._hosts.remove(host)
+                    self._active[host] = self._active.get(host, 0) + 1
+                    self._last_start[host] = now
+                    self._in_flight += 1
+                    return url
+
+                if not self._hosts and self._in_flight == 0:
+                    return None
+
+                self._cond.wait(timeout=wait)
+
+    def task_done(self, url):
+        """Marchează terminarea unui URL întors de get()."""
+
+        host = urlparse(url).netloc
+        with self._cond:
+            self._active[host] -= 1
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def close(self):
+        """Oprește crawl-ul: get() va întoarce None în toate thread-urile."""
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return sum(len(q) for q in self._queues.values())
@@ -0,0 +1,48 @@
+# Configurația gunicorn pentru serverul de vizualizare:
+#
+#     gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Valorile implicite pot fi schimbate prin variabilele de mediu de mai jos.
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# Several processes, each with a few threads: /view mostly waits on disk,
+# and listings and search share the in-memory archive index of their process
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", 4))
+
+# The archive index is built in the master and shared copy-on-write by the workers
+preload_app = True
+
+keepalive = 5
+timeout = 60
+graceful_timeout = 30
+
+# Workers are recycled periodically, which bounds slow leaks in long-running processes
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = os.environ.get("ACCESS_LOG") # de exemplu "-" pentru stdout
+loglevel = os.environ.get("LOG_LEVEL", "warning").lower()
+
+# Each worker keeps its own counters: they are written to METRICS_DIR and /metrics adds them up,
+# whichever worker answers the scrape. Files of recycled workers stay, so totals never go down.
+metrics_dir = os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), "archive-viewer-metrics"))
+
+def on_starting(server):
+    os.makedirs(metrics_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(metrics_dir, "*.json")):
+        os.remove(path) # Counters start from zero with each server start
+
+def post_fork(server, worker):
+    from metrics import metrics
+    metrics.reset() # With preload_app the worker inherits whatever the master recorded while loading
+
+def worker_exit(server, worker):
+    import server as viewer
+    viewer.flush_metrics(force=True) # The last values, before the worker is recycled or stopped
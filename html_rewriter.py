@@ -0,0 +1,203 @@
+from html import escape
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup, NavigableString
+from metrics import ERRORS, metrics
+
+# Tags whose src/href attributes the archiver reads and rewrites
+REWRITE_TAGS = {'img': 'src', 'script': 'src', 'link': 'href', 'a': 'href'}
+
+ENGINES = ('stream', 'bs4')
+
+# Tags whose content is not visible text
+INVISIBLE_TAGS = {'script', 'style', 'noscript', 'template', 'title'}
+
+
+class Ref:
+    """Un atribut src/href dintr-un tag, care poate fi rescris."""
+
+    __slots__ = ('tag', 'attr', 'value', 'attrs', '_node')
+
+    def __init__(self, tag, attr, value, attrs, node):
+        self.tag = tag
+        self.attr = attr
+        self.value = value
+        self.attrs = attrs # dict cu toate atributele tag-ului
+        self._node = node
+
+    @property
+    def rel(self):
+        """Valorile atributului rel (ex. ['stylesheet']), cu litere mici."""
+
+        rel = self.attrs.get('rel') or ''
+        if isinstance(rel, list):
+            rel = ' '.join(rel)
+        return rel.lower().split()
+
+
+class SoupDocument:
+    """Motorul clasic: arbore BeautifulSoup complet, serializat cu str(soup)."""
+
+    engine = 'bs4'
+
+    def __init__(self, html):
+        self.soup = BeautifulSoup(html, 'html.parser')
+
+    @property
+    def title(self):
+        title = self.soup.title
+        return title.get_text(' ', strip=True) if title else ''
+
+    def text(self):
+        """Textul vizibil al paginii (fără script, style etc.), cu spațiile comprimate."""
+
+        parts = []
+        for string in self.soup.find_all(string=True):
+            # Comment, Doctype etc. are NavigableString subclasses
+            if type(string) is not NavigableString:
+                continue
+            if any(parent.name in INVISIBLE_TAGS for parent in string.parents):
+                continue
+            parts.append(string)
+        return ' '.join(' '.join(parts).split())
+
+    def refs(self):
+        for node in self.soup.find_all(list(REWRITE_TAGS)):
+            attr = REWRITE_TAGS[node.name]
+            if node.has_attr(attr):
+                yield Ref(node.name, attr, node[attr], node.attrs, node)
+
+    def set(self, ref, value):
+        ref._node[ref.attr] = value
+        ref.value = value
+
+    def render(self):
+        return str(self.soup)
+
+
+class _TagCollector(HTMLParser):
+
+    def __init__(self, html):
+        super().__init__(convert_charrefs=True)
+        self.html = html
+        self.refs = []
+        self.title_parts = []
+        self.text_parts = []
+        self._invisible_depth = 0
+        self._in_title = False
+
+        # Offset of each line start, to turn getpos() into string indices
+        self._line_starts = [0]
+        find = html.find
+        pos = find('\n')
+        while pos != -1:
+            self._line_starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in INVISIBLE_TAGS:
+            self._invisible_depth += 1
+            self._in_title = self._in_title or tag == 'title'
+        self._collect(tag, attrs, False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._collect(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        if tag in INVISIBLE_TAGS and self._invisible_depth:
+            self._invisible_depth -= 1
+            if tag == 'title':
+                self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title_parts.append(data)
+        elif not self._invisible_depth:
+            self.text_parts.append(data)
+
+    def _collect(self, tag, attrs, self_closing):
+        attr = REWRITE_TAGS.get(tag)
+        if attr is None:
+            return
+        attr_map = dict(attrs)
+        value = attr_map.get(attr)
+        if value is None:
+            return
+
+        line, column = self.getpos()
+        start = self._line_starts[line - 1] + column
+        end = start + len(self.get_starttag_text())
+        self.refs.append(Ref(tag, attr, value, attr_map, [start, end, attrs, self_closing, False]))
+
+
+class StreamDocument:
+    """
+    Motor fără arbore: un singur pas de tokenizare (html.parser) reține doar
+    pozițiile tag-urilor img/script/link/a, iar render() copiază textul
+    original și reconstruiește numai tag-urile ale căror atribute s-au schimbat.
+    """
+
+    engine = 'stream'
+    soup = None
+
+    def __init__(self, html):
+        self.html = html
+        collector = _TagCollector(html)
+        collector.feed(html)
+        collector.close()
+        self._refs = collector.refs
+        self.title = ' '.join(''.join(collector.title_parts).split())
+        self._text_parts = collector.text_parts
+
+    def text(self):
+        """Textul vizibil al paginii (fără script, style etc.), cu spațiile comprimate."""
+
+        return ' '.join(' '.join(self._text_parts).split())
+
+    def refs(self):
+        return iter(self._refs)
+
+    def set(self, ref, value):
+        ref.value = value
+        ref.attrs[ref.attr] = value
+        ref._node[4] = True
+
+    def render(self):
+        out = []
+        last = 0
+        for ref in self._refs:
+            start, end, attrs, self_closing, changed = ref._node
+            if not changed:
+                continue
+            out.append(self.html[last:start])
+            out.append(_build_tag(ref.tag, [(name, ref.attrs.get(name) if name == ref.attr else value)
+                                            for name, value in attrs], self_closing))
+            last = end
+        out.append(self.html[last:])
+        return ''.join(out)
+
+
+def _build_tag(tag, attrs, self_closing):
+    parts = [tag]
+    for name, value in attrs:
+        parts.append(name if value is None else f'{name}="{escape(value, quote=True)}"')
+    return '<' + ' '.join(parts) + ('/>' if self_closing else '>')
+
+
+def parse_document(html, engine='stream'):
+    """
+    Parsează HTML-ul cu motorul ales ('stream' sau 'bs4').
+
+    Dacă motorul 'stream' eșuează pe un document malformat, se revine
+    automat la BeautifulSoup.
+    """
+
+    if engine not in ENGINES:
+        raise ValueError(f"Motor de parsare necunoscut: {engine}")
+
+    if engine == 'stream':
+        try:
+            return StreamDocument(html)
+        except Exception as e:
+            metrics.inc(ERRORS, category='parse')
+            print(f"[parser] Motorul stream a eșuat ({e}); folosesc BeautifulSoup.")
+    return SoupDocument(html)
@@ -1,36 +1,118 @@
 from crawler import crawl_domain
+from discovery import Discovery, discover
 from downloader import download_page
-from utils import load_dictionary, get_timestamp_folder, get_local_page_folder_name
+from probe import probe_paths
+from browser_pool import BrowserPool
+from manifest import Manifest
+from search_index import SearchIndex, SEARCH_DB_FILE
+from packfile import pack_snapshot
+from checkpoint import CrawlState, CRAWL_STATE_FILE, DONE
+from metrics import metrics
+from utils import DEFAULT_STRIP_PARAMS, canonicalize_url, iter_dictionary, get_timestamp_folder, get_local_page_folder_name, url_canonicalizer
+import argparse
+import logging
 import os
+import sys
 
 ARCHIVE_DIR = "archive"
-USE_SELENIUM = True 
+USE_SELENIUM = True # True, False sau "auto" (Selenium doar pentru paginile randate din JavaScript)
+BROWSER_POOL_SIZE = 2 # Câte browsere Firefox rămân pornite în paralel
+BROWSER_MAX_PAGES = 50 # După câte pagini este repornit un browser
+CRAWL_WORKERS = 4 # Câte pagini sunt procesate în paralel
+FETCH_ENGINE = "threads" # "threads" sau "async" (asyncio + aiohttp, doar cu USE_SELENIUM = False)
+ASYNC_WORKERS = 200 # Câte pagini sunt procesate simultan de motorul async
+PER_HOST_LIMIT = 2 # Cereri simultane maxime către același host
+HOST_DELAY = 0.5 # Secunde minime între două cereri către același host
+DICTIONARY_FILE = "urls_to_try.txt" # Căi suplimentare de încercat după crawl (pot fi liste foarte mari)
+PROBE_WORKERS = 8 # Căi din dicționar verificate simultan (HEAD/GET ușoare) înainte de descărcare
+INCREMENTAL = True # Cereri condiționale față de snapshot-ul anterior al domeniului
+USE_SITEMAPS = True # Citește robots.txt și sitemap-urile înainte de crawl (vezi discovery.py)
+PACKED_OUTPUT = False # Împachetează snapshot-ul într-un singur fișier la final (vezi packfile.py)
+# Parametri de query eliminați din URL-uri înainte de deduplicare (tipare ca "utm_*"); adăugați aici
+# parametrii de sesiune sau de urmărire ai site-ului arhivat
+STRIP_QUERY_PARAMS = DEFAULT_STRIP_PARAMS + ("sessionid", "phpsessid", "jsessionid")
+LOG_LEVEL = "WARNING" # "DEBUG" afișează fiecare link rescris sau ignorat
 
 if __name__ == "__main__":
-    base_url = input("Introduceți URL-ul de arhivat (ex: https://www.example.com): ").strip()
-    
-    if not base_url.endswith('/'):
-        base_url += '/'
+    parser = argparse.ArgumentParser(description="Arhivează un site web într-un snapshot offline.")
+    parser.add_argument('--resume', metavar='SNAPSHOT_DIR',
+                        help="continuă un crawl întrerupt din directorul snapshot-ului")
+    args = parser.parse_args()
 
-    snapshot_dir = get_timestamp_folder(base_url, ARCHIVE_DIR)
-    os.makedirs(snapshot_dir, exist_ok=True)
+    logging.basicConfig(level=LOG_LEVEL, format="[%(levelname)s] %(name)s: %(message)s")
+    url_canonicalizer.configure(strip_params=STRIP_QUERY_PARAMS)
 
-    print(f"[i] Salvez snapshot în directorul: {snapshot_dir}")
+    if args.resume:
+        snapshot_dir = os.path.normpath(args.resume)
+        state_path = os.path.join(snapshot_dir, CRAWL_STATE_FILE)
+        if not os.path.exists(state_path):
+            sys.exit(f"[eroare] Nu există o stare de crawl în {snapshot_dir}")
+        state = CrawlState(state_path)
+        base_url = state.get_meta('start_url')
+        print(f"[i] Reiau snapshot-ul {snapshot_dir} pentru {base_url}")
+    else:
+        base_url = input("Introduceți URL-ul de arhivat (ex: https://www.example.com): ").strip()
+        
+        if not base_url.endswith('/'):
+            base_url += '/'
+        # Same host key as every discovered link, and the same archive folder for Example.com and example.com
+        base_url = canonicalize_url(base_url)
+
+        snapshot_dir = get_timestamp_folder(base_url, ARCHIVE_DIR)
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+        print(f"[i] Salvez snapshot în directorul: {snapshot_dir}")
+
+        state = CrawlState(os.path.join(snapshot_dir, CRAWL_STATE_FILE))
+        state.set_meta('start_url', base_url)
+
+    search_index = SearchIndex(os.path.join(ARCHIVE_DIR, SEARCH_DB_FILE))
+    # La reluare, manifestul parțial salvat la întrerupere este completat
+    manifest = Manifest.load(snapshot_dir) or Manifest(snapshot_dir)
+    previous = Manifest.load_previous(snapshot_dir) if INCREMENTAL else None
+    if previous:
+        print(f"[i] Mod incremental față de: {previous.snapshot_root}")
 
-    crawl_domain(base_url, snapshot_dir, use_selenium=USE_SELENIUM)
+    # Crawler-ul și dicționarul folosesc același pool de browsere
+    pool = BrowserPool(size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES) if USE_SELENIUM else None
 
-    print("[i] Încerc URL-urile din dicționar...")
-    dictionary = load_dictionary("urls_to_try.txt")
-    for path in dictionary:
-        if not path.startswith('/'):
-            path = '/' + path
+    metrics.reset() # Durata din raport începe aici, nu de la prompt
+    try:
+        # Sitemap URLs seed the frontier (ignored when resuming); robots.txt may slow the crawl down
+        discovery = discover(base_url, previous=previous) if USE_SITEMAPS else Discovery()
+
+        seen = crawl_domain(base_url, snapshot_dir, use_selenium=USE_SELENIUM, pool=pool,
+                            workers=ASYNC_WORKERS if FETCH_ENGINE == "async" else CRAWL_WORKERS,
+                            per_host_limit=PER_HOST_LIMIT, host_delay=HOST_DELAY, fetch_engine=FETCH_ENGINE,
+                            seeds=discovery.seeds, host_delays=discovery.host_delays(base_url),
+                            unchanged=discovery.unchanged,
+                            state=state, manifest=manifest, previous=previous, search_index=search_index)
+
+        print("[i] Încerc URL-urile din dicționar...")
+        # Only the paths that exist (and were not archived by the crawl) are downloaded
+        for full_url in probe_paths(base_url, iter_dictionary(DICTIONARY_FILE), skip=seen, workers=PROBE_WORKERS):
+            # Same form as the crawled URLs: state, folder name and manifest must agree
+            full_url = canonicalize_url(full_url)
+            if state.status(full_url) == DONE:
+                continue
             
-        full_url = base_url.rstrip("/") + path 
-        
-        page_folder_name = get_local_page_folder_name(full_url)
-        output_path_for_dict_url = os.path.join(snapshot_dir, page_folder_name)
+            page_folder_name = get_local_page_folder_name(full_url)
+            output_path_for_dict_url = os.path.join(snapshot_dir, page_folder_name)
 
-        download_page(full_url, output_path_for_dict_url, snapshot_dir, use_selenium=USE_SELENIUM)
+            result = download_page(full_url, output_path_for_dict_url, snapshot_dir, use_selenium=USE_SELENIUM, pool=pool,
+                                   manifest=manifest, previous=previous, search_index=search_index)
+            state.finished(full_url, ok=result is not None and result[3])
+    finally:
+        if pool:
+            pool.shutdown()
+        # Manifestul este salvat și la întrerupere, pentru rularea incrementală următoare
+        manifest.save()
+        search_index.close()
+        state.close()
+        print(metrics.summary())
 
-    print("[✓] Snapshot complet salvat.")
+    if PACKED_OUTPUT:
+        count = pack_snapshot(snapshot_dir)
+        print(f"[i] {count} fișiere împachetate în snapshot.pack")
 
+    print("[✓] Snapshot complet salvat.")
@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+
+MANIFEST_FILE = "manifest.json"
+
+class Manifest:
+    """
+    Manifestul unui snapshot: pentru fiecare URL descărcat păstrează ETag,
+    Last-Modified, hash-ul conținutului și unde a fost salvat.
+
+    Intrările de tip "page" rețin și folderul paginii, momentul descărcării
+    (fetched, secunde Unix), link-urile interne și resursele ei; cele de tip
+    "asset" rețin numele fișierului din depozitul de resurse. Manifestul
+    snapshot-ului anterior este folosit pentru cereri condiționale
+    (If-None-Match / If-Modified-Since) la re-arhivare.
+    """
+
+    def __init__(self, snapshot_root=None, entries=None):
+        self.snapshot_root = snapshot_root
+        self._entries = dict(entries or {})
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, snapshot_root):
+        """Încarcă manifestul unui snapshot; întoarce None dacă nu există."""
+
+        path = os.path.join(snapshot_root, MANIFEST_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(snapshot_root, json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[eroare-manifest] Nu am putut citi {path}: {e}")
+            return None
+
+    @classmethod
+    def load_previous(cls, snapshot_root):
+        """Încarcă manifestul celui mai recent snapshot anterior al aceluiași domeniu."""
+
+        snapshot_root = os.path.normpath(snapshot_root)
+        site_dir, current = os.path.split(snapshot_root)
+        if not os.path.isdir(site_dir):
+            return None
+
+        # Timestamp folders sort chronologically
+        candidates = sorted((name for name in os.listdir(site_dir)
+                             if not name.startswith('_') and name < current), reverse=True)
+        for name in candidates:
+            manifest = cls.load(os.path.join(site_dir, name))
+            if manifest is not None:
+                return manifest
+        return None
+
+    def get(self, url):
+        with self._lock:
+            return self._entries.get(url)
+
+    def record(self, url, **fields):
+        """Adaugă sau actualizează intrarea pentru url (valorile None sunt omise)."""
+
+        with self._lock:
+            entry = self._entries.setdefault(url, {})
+            entry.update({key: value for key, value in fields.items() if value is not None})
+
+    def copy_from(self, other, url):
+        """Preia intrarea unui URL nemodificat din alt manifest; întoarce intrarea."""
+
+        entry = other.get(url)
+        if entry is not None:
+            with self._lock:
+                self._entries[url] = dict(entry)
+        return entry
+
+    def save(self, snapshot_root=None):
+        """Scrie manifestul în snapshot (atomic, printr-un fișier temporar)."""
+
+        snapshot_root = snapshot_root or self.snapshot_root
+        path = os.path.join(snapshot_root, MANIFEST_FILE)
+        with self._lock:
+            data = json.dumps(self._entries, ensure_ascii=False, indent=1)
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
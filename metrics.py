@@ -0,0 +1,247 @@
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds (Prometheus histogram "le" bounds)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Archiver
+STAGE_SECONDS = "archiver_stage_seconds"
+DOWNLOADED_BYTES = "archiver_downloaded_bytes_total"
+PAGES = "archiver_pages_total"
+ERRORS = "archiver_errors_total"
+PROBES = "archiver_probes_total"
+
+# Server
+HTTP_REQUESTS = "server_http_requests_total"
+HTTP_LATENCY = "server_http_request_duration_seconds"
+CACHE_LOOKUPS = "server_cache_lookups_total"
+
+STAGES = ('fetch', 'parse', 'rewrite', 'resources', 'write', 'index')
+
+
+class Metrics:
+    """
+    Registru de metrici (contoare, valori și histograme cu etichete), sigur
+    pentru mai multe thread-uri, exportabil în formatul text Prometheus.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started = time.monotonic()
+
+        self._types = {} # nume -> 'counter' | 'gauge' | 'histogram'
+        self._help = {}
+        self._series = {} # nume -> {etichete: valoare sau [numărători pe bucket-uri, sumă, număr]}
+        self._lock = threading.Lock()
+
+    def describe(self, name, help_text, kind):
+        with self._lock:
+            self._types[name] = kind
+            self._help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._types.setdefault(name, 'counter')
+            series = self._series.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._types.setdefault(name, 'gauge')
+            self._series.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._types.setdefault(name, 'histogram')
+            series = self._series.setdefault(name, {})
+            entry = series.get(key)
+            if entry is None:
+                entry = series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """`with metrics.timer(STAGE_SECONDS, stage='parse'): ...` adaugă durata în histogramă."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def value(self, name, **labels):
+        """Valoarea unui contor/gauge sau (număr, sumă) pentru o histogramă."""
+
+        with self._lock:
+            entry = self._series.get(name, {}).get(_label_key(labels))
+            if self._types.get(name) == 'histogram':
+                return (entry[2], entry[1]) if entry else (0, 0.0)
+            return entry or 0
+
+    def totals(self, name, label):
+        """Valorile unui contor însumate după o etichetă: {valoare etichetă: total}."""
+
+        with self._lock:
+            totals = {}
+            for key, value in self._series.get(name, {}).items():
+                label_value = dict(key).get(label, '')
+                totals[label_value] = totals.get(label_value, 0) + value
+            return totals
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self.started = time.monotonic()
+
+    def dump(self, path):
+        """Scrie seriile registrului în fișierul JSON `path` (atomic), pentru merge() în alt proces."""
+
+        with self._lock:
+            data = {
+                'types': self._types,
+                'help': self._help,
+                'series': {name: [[list(map(list, key)), value] for key, value in series.items()]
+                           for name, series in self._series.items()},
+            }
+            encoded = json.dumps(data, separators=(',', ':'))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(encoded)
+        os.replace(tmp_path, path)
+
+    def merge(self, path):
+        """Adună în registru seriile scrise cu dump() (contoarele, valorile și histogramele se însumează)."""
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return # Worker still starting, or the file vanished between listing and reading
+        with self._lock:
+            for name, kind in data['types'].items():
+                self._types.setdefault(name, kind)
+            for name, help_text in data['help'].items():
+                self._help.setdefault(name, help_text)
+            for name, rows in data['series'].items():
+                series = self._series.setdefault(name, {})
+                for key, value in rows:
+                    key = tuple(map(tuple, key))
+                    if self._types.get(name) != 'histogram':
+                        series[key] = series.get(key, 0) + value
+                        continue
+                    entry = series.get(key)
+                    if entry is None:
+                        entry = series[key] = [[0] * len(self.buckets), 0.0, 0]
+                    entry[0] = [a + b for a, b in zip(entry[0], value[0])]
+                    entry[1] += value[1]
+                    entry[2] += value[2]
+
+    def to_prometheus(self):
+        """Toate metricile în formatul text Prometheus (version 0.0.4)."""
+
+        lines = []
+        with self._lock:
+            for name in sorted(self._series):
+                kind = self._types.get(name, 'untyped')
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self._series[name].items()):
+                    if kind != 'histogram':
+                        lines.append(f"{name}{_format_labels(key)} {_format_number(value)}")
+                        continue
+                    counts, total, count = value
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', _format_number(bound)),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_number(total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self, elapsed=None):
+        """Raportul de la sfârșitul unei rulări a arhivatorului (text pe mai multe linii)."""
+
+        if elapsed is None:
+            elapsed = time.monotonic() - self.started
+        pages = self.totals(PAGES, 'result')
+        downloaded = self.totals(DOWNLOADED_BYTES, 'kind')
+        errors = self.totals(ERRORS, 'category')
+        saved = pages.get('saved', 0) + pages.get('unchanged', 0)
+
+        lines = [
+            f"[metrici] Durată: {elapsed:.1f}s, {saved / max(elapsed, 1e-9):.2f} pagini/s",
+            f"[metrici] Pagini: {pages.get('saved', 0)} salvate, {pages.get('unchanged', 0)} nemodificate, "
+            f"{pages.get('failed', 0)} eșuate",
+            f"[metrici] Descărcat: {_format_bytes(sum(downloaded.values()))} ("
+            + ', '.join(f"{kind} {_format_bytes(size)}" for kind, size in sorted(downloaded.items())) + ")",
+        ]
+        # Stage times are summed over all worker threads, so they can exceed the wall time
+        stage_parts = []
+        for stage in STAGES:
+            count, total = self.value(STAGE_SECONDS, stage=stage)
+            if count:
+                stage_parts.append(f"{stage} {total:.1f}s ({count} × {total / count * 1000:.1f} ms)")
+        if stage_parts:
+            lines.append("[metrici] Timp pe etape (cumulat pe thread-uri): " + ', '.join(stage_parts))
+        probes = self.totals(PROBES, 'result')
+        if probes:
+            lines.append(f"[metrici] Dicționar: {sum(probes.values())} căi, {probes.get('hit', 0)} găsite, "
+                         f"{probes.get('soft404', 0)} soft-404")
+        lines.append("[metrici] Erori: " + (', '.join(f"{category} {count}" for category, count in sorted(errors.items()))
+                                           if errors else "niciuna"))
+        return '\n'.join(lines)
+
+
+def combined_metrics(directory, buckets=DEFAULT_BUCKETS):
+    """Registrul cu suma metricilor scrise (dump) de toate procesele în directory."""
+
+    combined = Metrics(buckets)
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        combined.merge(path)
+    return combined
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(key):
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in key) + '}'
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+# Default registry: one per process (the archiver and the server run separately)
+metrics = Metrics()
+metrics.describe(STAGE_SECONDS, "Durata etapelor de arhivare per pagină.", 'histogram')
+metrics.describe(DOWNLOADED_BYTES, "Octeți descărcați, după tip (page, resource).", 'counter')
+metrics.describe(PAGES, "Pagini procesate, după rezultat (saved, unchanged, failed).", 'counter')
+metrics.describe(ERRORS, "Erori de arhivare, după categorie.", 'counter')
+metrics.describe(PROBES, "Căi din dicționar verificate, după rezultat (hit, missing, soft404, skipped, error).", 'counter')
+metrics.describe(HTTP_REQUESTS, "Cereri HTTP servite, după endpoint și status.", 'counter')
+metrics.describe(HTTP_LATENCY, "Latența cererilor HTTP, după endpoint.", 'histogram')
+metrics.describe(CACHE_LOOKUPS, "Accesări ale cache-urilor serverului, după cache și rezultat (hit, miss).", 'counter')
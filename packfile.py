@@ -0,0 +1,269 @@
+"""
+Formatul „împachetat” al unui snapshot: un singur fișier append-only
+(snapshot.pack) cu toate fișierele snapshot-ului și un index compact
+(snapshot.pack.idx) cu offset-ul, lungimea și hash-ul fiecărui fișier.
+
+Paginile păstrate în depozitul comun al domeniului (page_store.py) sunt
+copiate în pack sub _pages/<nume>.page, comprimate ca în depozit. Cu --prune,
+din depozit sunt apoi șterse cele la care nu mai trimite niciun snapshot
+neîmpachetat; se folosește doar când niciun crawl al domeniului nu rulează
+și nici nu va fi reluat, altfel paginile lui pot rămâne fără conținut.
+
+Conversia unui snapshot existent (director) în format împachetat:
+
+    python packfile.py archive/<domeniu>/<timestamp> [--keep] [--prune]
+"""
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import threading
+from metrics import CACHE_LOOKUPS, metrics
+from page_store import BLOB_EXTENSION, PAGES_DIR_NAME, REF_SUFFIX, PageStore, read_page_ref
+
+PACK_FILE = "snapshot.pack"
+PACK_INDEX_FILE = "snapshot.pack.idx"
+
+# Each record: magic, path length, data length, path (UTF-8), data.
+# The header makes the pack self-describing, so the index can be rebuilt.
+RECORD_MAGIC = b"PKR1"
+RECORD_HEADER = struct.Struct(">4sIQ")
+
+# Files that stay loose next to the pack (read by the archiver itself)
+LOOSE_FILES = {"manifest.json", "crawl_state.sqlite", "crawl_state.sqlite-wal", "crawl_state.sqlite-shm"}
+
+class PackWriter:
+    """Adaugă fișiere la sfârșitul pack-ului unui snapshot și păstrează indexul."""
+
+    def __init__(self, snapshot_root):
+        self.snapshot_root = snapshot_root
+        self.pack_path = os.path.join(snapshot_root, PACK_FILE)
+        self.index_path = os.path.join(snapshot_root, PACK_INDEX_FILE)
+
+        self.index = _load_index(self.index_path)
+        self._file = open(self.pack_path, 'ab')
+        self._lock = threading.Lock()
+
+    def add(self, relpath, data):
+        """Adaugă conținutul `data` (bytes) sub calea relativă `relpath`."""
+
+        relpath = relpath.replace(os.sep, '/')
+        encoded_path = relpath.encode('utf-8')
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(RECORD_HEADER.pack(RECORD_MAGIC, len(encoded_path), len(data)))
+            self._file.write(encoded_path)
+            data_offset = offset + RECORD_HEADER.size + len(encoded_path)
+            self._file.write(data)
+            self.index[relpath] = [data_offset, len(data), hashlib.sha256(data).hexdigest()]
+
+    def add_file(self, relpath, path):
+        with open(path, 'rb') as f:
+            self.add(relpath, f.read())
+
+    def close(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, separators=(',', ':'))
+            os.replace(tmp_path, self.index_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class PackReader:
+    """
+    Citește un pack prin mmap: get() întoarce un memoryview direct peste
+    fișierul mapat în memorie, fără copiere.
+    """
+
+    def __init__(self, snapshot_root):
+        self.snapshot_root = snapshot_root
+        self.index = _load_index(os.path.join(snapshot_root, PACK_INDEX_FILE))
+
+        with open(os.path.join(snapshot_root, PACK_FILE), 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else None
+        self._view = memoryview(self._map) if self._map is not None else memoryview(b'')
+
+    def get(self, relpath):
+        entry = self.index.get(relpath)
+        if entry is None:
+            return None
+        offset, length, _sha = entry
+        return self._view[offset:offset + length]
+
+    def etag(self, relpath):
+        entry = self.index.get(relpath)
+        return entry[2] if entry else None
+
+    def __contains__(self, relpath):
+        return relpath in self.index
+
+    def page_folders(self):
+        """Folderele de pagini (cu index.html sau index.html.ref) din pack."""
+
+        folders = set()
+        for path in self.index:
+            if path.count('/') == 1:
+                folder, name = path.split('/')
+                if name in ('index.html', 'index.html' + REF_SUFFIX):
+                    folders.add(folder)
+        return folders
+
+
+_readers = {}
+_readers_lock = threading.Lock()
+
+def is_packed(snapshot_root):
+    return os.path.exists(os.path.join(snapshot_root, PACK_INDEX_FILE))
+
+def open_pack(snapshot_root):
+    """
+    PackReader-ul unui snapshot, refolosit între apeluri cât timp indexul nu
+    se schimbă; None dacă snapshot-ul nu este împachetat.
+    """
+
+    key = os.path.abspath(snapshot_root)
+    try:
+        mtime = os.stat(os.path.join(key, PACK_INDEX_FILE)).st_mtime_ns
+    except OSError:
+        return None
+
+    with _readers_lock:
+        cached = _readers.get(key)
+        if cached and cached[0] == mtime:
+            metrics.inc(CACHE_LOOKUPS, cache='pack_reader', result='hit')
+            return cached[1]
+        metrics.inc(CACHE_LOOKUPS, cache='pack_reader', result='miss')
+        reader = PackReader(key)
+        _readers[key] = (mtime, reader)
+        return reader
+
+def read_snapshot_file(snapshot_root, relpath):
+    """
+    Conținutul unui fișier din snapshot (director sau pack) sau None. O pagină
+    salvată în depozitul comun (fișier .ref) este citită și decomprimată din el.
+    """
+
+    data = _read_raw(snapshot_root, relpath)
+    if data is not None:
+        return data
+    ref = _read_raw(snapshot_root, relpath + REF_SUFFIX)
+    if ref is not None:
+        return read_stored_page(snapshot_root, ref.decode('utf-8').strip())
+    return None
+
+def read_stored_page(snapshot_root, name):
+    """Pagina `name` din depozitul domeniului sau, dacă a fost mutată acolo, din pack-ul snapshot-ului."""
+
+    store = PageStore.for_snapshot(snapshot_root)
+    data = store.get(name)
+    if data is None:
+        blob = _read_raw(snapshot_root, _packed_page_path(name))
+        data = store.decode(blob, name) if blob is not None else None
+    return data
+
+def _read_raw(snapshot_root, relpath):
+    try:
+        with open(os.path.join(snapshot_root, relpath), 'rb') as f:
+            return f.read()
+    except OSError:
+        pass
+    reader = open_pack(snapshot_root)
+    if reader is not None:
+        data = reader.get(relpath.replace(os.sep, '/'))
+        return bytes(data) if data is not None else None
+    return None
+
+def pack_snapshot(snapshot_root, remove_files=True, prune_pages=False):
+    """
+    Împachetează toate fișierele unui snapshot (director) în snapshot.pack.
+    Cu remove_files=True, fișierele și folderele împachetate sunt șterse.
+    Cu prune_pages=True (și remove_files), paginile copiate în pack sunt
+    șterse și din depozitul comun, dacă nu le mai folosește alt snapshot.
+    Întoarce numărul de fișiere adăugate.
+    """
+
+    added = 0
+    packed_dirs = []
+    packed_pages = set()
+    store = PageStore.for_snapshot(snapshot_root)
+    with PackWriter(snapshot_root) as writer:
+        for root, dirs, files in os.walk(snapshot_root):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                relpath = os.path.relpath(path, snapshot_root)
+                if root == snapshot_root and (name in LOOSE_FILES or name.startswith(PACK_FILE)):
+                    continue
+                writer.add_file(relpath, path)
+                added += 1
+                if name.endswith(REF_SUFFIX):
+                    # The page itself goes in too, so the pack does not leave one file per page behind
+                    page_name = read_page_ref(path)
+                    blob = store.blob(page_name) if page_name not in packed_pages else None
+                    if blob is not None:
+                        writer.add(_packed_page_path(page_name), blob)
+                        packed_pages.add(page_name)
+            if root != snapshot_root and os.path.dirname(root) == snapshot_root:
+                packed_dirs.append(root)
+
+    if remove_files:
+        for folder in packed_dirs:
+            shutil.rmtree(folder, ignore_errors=True)
+        if prune_pages:
+            _prune_page_store(snapshot_root, store, packed_pages)
+    return added
+
+def _prune_page_store(snapshot_root, store, packed_pages):
+    """
+    Șterge din depozit paginile copiate în pack la care nu mai trimite niciun
+    snapshot neîmpachetat. Un crawl în curs scrie referința după pagină, deci
+    pruning-ul nu trebuie să ruleze în paralel cu el.
+    """
+
+    site_dir = os.path.dirname(os.path.abspath(snapshot_root))
+    still_used = set()
+    for version in os.listdir(site_dir):
+        version_dir = os.path.join(site_dir, version)
+        # _pages, _store and the like are not snapshots
+        if version.startswith('_') or not os.path.isdir(version_dir):
+            continue
+        for folder in os.listdir(version_dir):
+            ref_path = os.path.join(version_dir, folder, 'index.html' + REF_SUFFIX)
+            if os.path.exists(ref_path):
+                still_used.add(read_page_ref(ref_path))
+
+    for name in packed_pages - still_used:
+        store.remove(name)
+
+def _packed_page_path(name):
+    return f"{PAGES_DIR_NAME}/{name}{BLOB_EXTENSION}"
+
+def _load_index(index_path):
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if len(args) != 1 or not os.path.isdir(args[0]):
+        sys.exit(__doc__)
+
+    snapshot = args[0]
+    count = pack_snapshot(snapshot, remove_files='--keep' not in sys.argv, prune_pages='--prune' in sys.argv)
+    print(f"[✓] {count} fișiere împachetate în {os.path.join(snapshot, PACK_FILE)}")
@@ -0,0 +1,242 @@
+import hashlib
+import os
+import re
+import struct
+import threading
+import uuid
+import zlib
+from collections import Counter
+
+try:
+    import zstandard
+except ImportError: # zstandard este opțional; fără el paginile sunt comprimate cu zlib
+    zstandard = None
+
+PAGES_DIR_NAME = "_pages"
+REF_SUFFIX = ".ref" # folder/index.html.ref conține numele paginii din depozit
+BLOB_EXTENSION = ".page"
+
+DICT_SAMPLES = 64 # Pagini adunate înainte de antrenarea dicționarului domeniului
+ZLIB_DICT_SIZE = 32 * 1024 # Fereastra zlib: un dicționar mai mare nu ajută
+ZSTD_DICT_SIZE = 112 * 1024
+COMPRESSION_LEVEL = 9
+
+# Blob header: magic, codec, first 8 bytes of the dictionary's SHA-256 (zeros = no dictionary)
+BLOB_MAGIC = b"PGZ1"
+BLOB_HEADER = struct.Struct(">4sc8s")
+NO_DICTIONARY = bytes(8)
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+
+_SEGMENT_RE = re.compile(rb'[^>]*>|[^>]+$')
+
+
+class PageStore:
+    """
+    Depozitul de pagini HTML comun tuturor snapshot-urilor unui domeniu.
+
+    Fiecare pagină este salvată o singură dată în archive/<domeniu>/_pages/
+    sub numele <sha256 conținut>.page, iar snapshot-urile păstrează doar un
+    fișier index.html.ref cu acest nume. Paginile sunt comprimate cu un
+    dicționar antrenat pe paginile domeniului (zstd dacă modulul zstandard
+    este instalat, altfel zlib cu zdict), deci șablonul comun (antet, meniu,
+    subsol) nu mai ocupă spațiu în fiecare pagină aproape identică.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, root):
+        self.root = root
+
+        self.codec = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+        self._dictionaries = {} # id -> conținutul dicționarului
+        self._current = self._find_dictionary() # (id, conținut) folosit la scriere sau None
+        self._samples = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_snapshot(cls, snapshot_root):
+        """Întoarce depozitul de pagini al domeniului căruia îi aparține snapshot_root."""
+
+        return cls.open(pages_root(os.path.dirname(os.path.abspath(snapshot_root))))
+
+    @classmethod
+    def open(cls, root):
+        """Întoarce instanța (comună procesului) a depozitului din directorul root."""
+
+        root = os.path.abspath(root)
+        with cls._instances_lock:
+            store = cls._instances.get(root)
+            if store is None:
+                store = cls._instances[root] = cls(root)
+            return store
+
+    def put(self, data):
+        """Salvează pagina (bytes) dacă nu există deja și întoarce numele ei."""
+
+        name = hashlib.sha256(data).hexdigest()
+        path = self.path(name)
+        if os.path.exists(path):
+            return name
+
+        with self._lock:
+            current = self._current
+            if current is None:
+                self._collect_sample(data)
+
+        blob = self._compress(data, current)
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+        return name
+
+    def get(self, name):
+        """Conținutul decomprimat al paginii sau None dacă lipsește."""
+
+        blob = self.blob(name)
+        return self.decode(blob, name) if blob is not None else None
+
+    def blob(self, name):
+        """Fișierul paginii așa cum este pe disc (comprimat, cu antet) sau None."""
+
+        try:
+            with open(self.path(name), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def decode(self, blob, name=''):
+        """Decomprimă un blob de pagină (ex. unul copiat într-un snapshot împachetat)."""
+
+        magic, codec, dictionary_id = BLOB_HEADER.unpack_from(blob)
+        if magic != BLOB_MAGIC:
+            raise ValueError(f"Fișier de pagină invalid: {name}")
+        payload = memoryview(blob)[BLOB_HEADER.size:]
+        dictionary = self._dictionary(dictionary_id, codec) if dictionary_id != NO_DICTIONARY else None
+
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError(f"Pagina {name} este comprimată cu zstd; instalați modulul zstandard.")
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(payload)
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        return decompressor.decompress(payload) + decompressor.flush()
+
+    def path(self, name):
+        return os.path.join(self.root, name + BLOB_EXTENSION)
+
+    def exists(self, name):
+        return bool(name) and os.path.exists(self.path(name))
+
+    def remove(self, name):
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def _compress(self, data, current):
+        dictionary_id, dictionary = current if current else (NO_DICTIONARY, None)
+        if self.codec == CODEC_ZSTD:
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            payload = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=dict_data).compress(data)
+        else:
+            compressor = (zlib.compressobj(COMPRESSION_LEVEL, zdict=dictionary) if dictionary
+                          else zlib.compressobj(COMPRESSION_LEVEL))
+            payload = compressor.compress(data) + compressor.flush()
+        return BLOB_HEADER.pack(BLOB_MAGIC, self.codec, dictionary_id) + payload
+
+    def _collect_sample(self, data):
+        # Called with the lock held, only while the domain has no dictionary yet
+        self._samples.append(data)
+        if len(self._samples) < DICT_SAMPLES:
+            return
+
+        samples, self._samples = self._samples, []
+        try:
+            dictionary = self._train(samples)
+        except Exception as e:
+            print(f"[pagini] Nu am putut antrena dicționarul de compresie: {e}")
+            return
+        if not dictionary:
+            return
+
+        dictionary_id = hashlib.sha256(dictionary).digest()[:8]
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        with open(tmp_path, 'wb') as f:
+            f.write(dictionary)
+        os.replace(tmp_path, self._dictionary_path(dictionary_id, self.codec))
+        self._dictionaries[dictionary_id] = dictionary
+        self._current = (dictionary_id, dictionary)
+        print(f"[pagini] Dicționar de compresie antrenat pe {len(samples)} pagini ({len(dictionary)} octeți)")
+
+    def _train(self, samples):
+        if self.codec == CODEC_ZSTD:
+            return zstandard.train_dictionary(ZSTD_DICT_SIZE, samples).as_bytes()
+        return build_zlib_dictionary(samples)
+
+    def _find_dictionary(self):
+        suffix = '.' + self.codec.decode()
+        if not os.path.isdir(self.root):
+            return None
+        names = sorted(name for name in os.listdir(self.root) if name.startswith('dict-') and name.endswith(suffix))
+        if not names:
+            return None
+        dictionary_id = bytes.fromhex(names[0][len('dict-'):-len(suffix)])
+        return dictionary_id, self._dictionary(dictionary_id, self.codec)
+
+    def _dictionary(self, dictionary_id, codec):
+        dictionary = self._dictionaries.get(dictionary_id)
+        if dictionary is None:
+            with open(self._dictionary_path(dictionary_id, codec), 'rb') as f:
+                dictionary = self._dictionaries[dictionary_id] = f.read()
+        return dictionary
+
+    def _dictionary_path(self, dictionary_id, codec):
+        return os.path.join(self.root, f"dict-{dictionary_id.hex()}.{codec.decode()}")
+
+
+def build_zlib_dictionary(samples, size=ZLIB_DICT_SIZE):
+    """
+    Dicționar zlib (zdict) din fragmentele de HTML (până la '>') care apar în
+    mai multe pagini, adică șablonul comun al site-ului. Cele mai valoroase
+    fragmente sunt puse la sfârșit, unde zlib le găsește cel mai ușor.
+    """
+
+    frequency = Counter()
+    for sample in samples:
+        frequency.update(set(_SEGMENT_RE.findall(sample)))
+
+    shared = [(count * len(segment), segment) for segment, count in frequency.items()
+              if count > 1 and len(segment) >= 8]
+    shared.sort(reverse=True)
+
+    chosen, total = [], 0
+    for _score, segment in shared:
+        if total + len(segment) > size:
+            continue
+        chosen.append(segment)
+        total += len(segment)
+    return b''.join(reversed(chosen))
+
+
+def read_page_ref(ref_path):
+    """Numele paginii din depozit indicat de un fișier .ref."""
+
+    with open(ref_path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+def write_page_ref(page_filename, name):
+    """Scrie page_filename + '.ref' și șterge o eventuală copie completă mai veche."""
+
+    for stale in (page_filename, page_filename + '.gz', page_filename + '.br'):
+        if os.path.exists(stale):
+            os.remove(stale)
+    with open(page_filename + REF_SUFFIX, 'w', encoding='utf-8') as f:
+        f.write(name)
+
+def pages_root(site_dir):
+    return os.path.join(site_dir, PAGES_DIR_NAME)
@@ -0,0 +1,213 @@
+import re
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+import requests
+from downloader import get_session
+from frontier import normalize_url
+from metrics import DOWNLOADED_BYTES, ERRORS, PROBES, metrics
+
+PROBE_WORKERS = 8 # Căi verificate simultan
+PROBE_TIMEOUT = 10
+PROBE_MAX_BYTES = 512 * 1024 # Din corpul unui răspuns se citește cel mult atât pentru comparație
+SOFT_404_SIMILARITY = 0.9 # Similaritatea (Jaccard pe grupuri de cuvinte) peste care o pagină e considerată soft-404
+SHINGLE_WORDS = 4
+
+HIT, MISSING, SOFT_404, ERROR = 'hit', 'missing', 'soft404', 'error'
+
+_WORD_RE = re.compile(r'\w+')
+
+
+class _Fingerprint:
+    """Răspunsul unui server la o cale inexistentă (pagina lui de „404” cu status 200)."""
+
+    __slots__ = ('final_path', 'redirected', 'length', 'shingles')
+
+    def __init__(self, final_path, redirected, length, shingles):
+        self.final_path = final_path
+        self.redirected = redirected
+        self.length = length
+        self.shingles = shingles
+
+
+class Prober:
+    """
+    Verifică rapid care căi dintr-un dicționar există pe un site, înainte de
+    a le trimite prin download_page.
+
+    Căile sunt citite pe măsură ce sunt verificate (dicționarul poate fi un
+    generator peste un fișier oricât de mare) și verificate în paralel de
+    `workers` thread-uri prin sesiunea HTTP comună. Pentru fiecare director,
+    o cale aleatoare stabilește cum răspunde serverul la pagini inexistente:
+    dacă răspunde cu 404, o cerere HEAD ajunge; dacă răspunde cu 200
+    (soft-404), paginile sunt descărcate cu GET și comparate cu acel răspuns.
+    """
+
+    def __init__(self, base_url, workers=PROBE_WORKERS, session=None):
+        self.base_url = base_url.rstrip('/')
+        self.base_netloc = urlparse(base_url).netloc
+        self.workers = workers
+        self.session = session or get_session()
+
+        self.counts = {HIT: 0, MISSING: 0, SOFT_404: 0, ERROR: 0, 'skipped': 0}
+        self._found = set()
+        self._baselines = {} # director -> Future cu _Fingerprint sau None (serverul răspunde cu 404)
+        self._baselines_lock = threading.Lock()
+
+    def run(self, paths, skip=()):
+        """
+        Generator cu URL-urile (absolute) care există, în ordinea în care sunt
+        găsite. `skip` conține URL-urile normalizate deja arhivate (ex. mulțimea
+        întoarsă de crawl_domain); ele nu mai sunt verificate.
+        """
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = set()
+            for url in self._candidates(paths, skip):
+                # Only a small window of paths is in flight, however long the wordlist is
+                if len(pending) >= self.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from self._collect(done)
+                pending.add(executor.submit(self._check, url))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from self._collect(done)
+
+    def check(self, url):
+        """Rezultatul verificării unui URL: HIT, MISSING, SOFT_404 sau ERROR."""
+
+        path = urlparse(url).path or '/'
+        try:
+            baseline = self._baseline(path)
+            if baseline is None:
+                response = self.session.head(url, timeout=PROBE_TIMEOUT, allow_redirects=True)
+                if response.status_code not in (405, 501): # HEAD not supported: fall back to GET
+                    return HIT if self._exists(response) else MISSING
+            response, text = self._get(url)
+            if not self._exists(response):
+                return MISSING
+            if baseline is not None and _matches(baseline, response, _strip(text, path)):
+                return SOFT_404
+            return HIT
+        except requests.RequestException as e:
+            metrics.inc(ERRORS, category='network')
+            print(f"[probe] Eroare la {url}: {e}")
+            return ERROR
+
+    def summary(self):
+        counts = self.counts
+        total = sum(counts.values())
+        return (f"[probe] {total} căi din dicționar: {counts[HIT]} găsite, {counts[MISSING]} inexistente, "
+                f"{counts[SOFT_404]} soft-404, {counts['skipped']} deja arhivate, {counts[ERROR]} erori")
+
+    def _candidates(self, paths, skip):
+        for path in paths:
+            if not path.startswith('/'):
+                path = '/' + path
+            url = self.base_url + path
+            if normalize_url(url) in skip:
+                self._count('skipped')
+                continue
+            yield url
+
+    def _check(self, url):
+        return url, self.check(url)
+
+    def _collect(self, done):
+        for future in done:
+            url, result = future.result()
+            self._count(result)
+            # The same path may appear more than once in a wordlist
+            if result == HIT and normalize_url(url) not in self._found:
+                self._found.add(normalize_url(url))
+                print(f"[probe] Găsit: {url}")
+                yield url
+
+    def _count(self, result):
+        self.counts[result] += 1
+        metrics.inc(PROBES, result=result)
+
+    def _baseline(self, path):
+        directory = path.rsplit('/', 1)[0] + '/'
+        with self._baselines_lock:
+            future = self._baselines.get(directory)
+            owner = future is None
+            if owner:
+                future = self._baselines[directory] = Future()
+
+        if owner:
+            # Only callers probing this same directory wait for its fingerprint request
+            try:
+                future.set_result(self._fingerprint(directory))
+            except BaseException as e:
+                future.set_exception(e)
+                with self._baselines_lock:
+                    del self._baselines[directory] # A failed request is retried by the next caller
+        return future.result()
+
+    def _fingerprint(self, directory):
+        token = uuid.uuid4().hex
+        response, text = self._get(self.base_url + directory + token)
+        if not self._exists(response):
+            return None
+        print(f"[probe] {self.base_url}{directory} răspunde cu {response.status_code} la pagini inexistente; "
+              f"compar răspunsurile cu acesta (soft-404)")
+        text = _strip(text, directory + token)
+        return _Fingerprint(urlparse(response.url).path, bool(response.history), len(text), _shingles(text))
+
+    def _get(self, url):
+        """(răspuns, începutul corpului ca text): doar atât trebuie comparat cu pagina de 404."""
+
+        with self.session.get(url, timeout=PROBE_TIMEOUT, allow_redirects=True, stream=True) as response:
+            body = bytearray()
+            for chunk in response.iter_content(65536):
+                body += chunk
+                if len(body) >= PROBE_MAX_BYTES:
+                    break
+        metrics.inc(DOWNLOADED_BYTES, len(body), kind='probe')
+        return response, bytes(body[:PROBE_MAX_BYTES]).decode(response.encoding or 'utf-8', errors='replace')
+
+    def _exists(self, response):
+        # A redirect to another host (e.g. a login provider) is not a page of this site
+        return 200 <= response.status_code < 300 and urlparse(response.url).netloc == self.base_netloc
+
+
+def probe_paths(base_url, paths, skip=(), workers=PROBE_WORKERS):
+    """
+    Generator cu URL-urile din `paths` (căi relative la base_url, citite pe
+    măsură ce sunt verificate) care există pe site. Vezi Prober.
+    """
+
+    prober = Prober(base_url, workers=workers)
+    yield from prober.run(paths, skip=skip)
+    print(prober.summary())
+
+
+def _last_segment(path):
+    return path.rstrip('/').rsplit('/', 1)[-1]
+
+def _strip(text, path):
+    """Textul fără calea cerută, pe care paginile soft-404 o repetă de obicei."""
+
+    text = text.replace(path, '', 1)
+    # Some echo only the last segment; removing every occurrence would also erase real words ("a", "nav")
+    segment = _last_segment(path)
+    return re.sub(rf'(?<!\w){re.escape(segment)}(?!\w)', '', text, count=1) if segment else text
+
+def _shingles(text):
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {hash(tuple(words))}
+    return {hash(tuple(words[i:i + SHINGLE_WORDS])) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+def _matches(baseline, response, text):
+    """True dacă răspunsul (și textul lui) seamănă cu pagina serverului pentru căi inexistente."""
+
+    if baseline.redirected and response.history and urlparse(response.url).path == baseline.final_path:
+        return True
+    if abs(len(text) - baseline.length) > max(baseline.length, len(text)) * (1 - SOFT_404_SIMILARITY):
+        return False
+    shingles = _shingles(text)
+    union = len(shingles | baseline.shingles)
+    return union == 0 or len(shingles & baseline.shingles) / union >= SOFT_404_SIMILARITY
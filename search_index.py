@@ -0,0 +1,139 @@
+import re
+import sqlite3
+import threading
+import time
+
+SEARCH_DB_FILE = "_search.sqlite"
+
+# Markers placed around matched words in snippets; the server turns them into <mark>
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+class SearchIndex:
+    """
+    Index full-text (SQLite FTS5) peste titlul și textul vizibil al paginilor.
+
+    Arhivatorul adaugă paginile pe măsură ce le salvează (scrierile sunt
+    grupate în commit-uri periodice), iar serverul interoghează indexul cu
+    rezultate ordonate după relevanță (bm25) și fragmente de text.
+    """
+
+    def __init__(self, db_path, commit_every=200, commit_interval=5.0):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5("
+            "title, body, url UNINDEXED, site UNINDEXED, version UNINDEXED, folder UNINDEXED, "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        # UNINDEXED FTS5 columns can only be scanned: pages are found by rowid through this table
+        has_locations = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'page_rows'").fetchone()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_rows (site TEXT, version TEXT, folder TEXT, page_rowid INTEGER NOT NULL, "
+            "PRIMARY KEY (site, version, folder)) WITHOUT ROWID"
+        )
+        if not has_locations:
+            # Index created before page_rows existed
+            self._conn.execute("INSERT OR REPLACE INTO page_rows SELECT site, version, folder, rowid FROM pages")
+        self._conn.commit()
+
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add_page(self, site, version, folder, url, title, text):
+        """Indexează (sau reindexează) o pagină dintr-un snapshot."""
+
+        with self._lock:
+            self._delete(site, version, folder)
+            cursor = self._conn.execute(
+                "INSERT INTO pages (title, body, url, site, version, folder) VALUES (?, ?, ?, ?, ?, ?)",
+                (title, text, url, site, version, folder))
+            self._set_rowid(site, version, folder, cursor.lastrowid)
+            self._maybe_commit()
+
+    def copy_page(self, site, from_version, from_folder, version, folder):
+        """Copiază intrarea unei pagini nemodificate dintr-un snapshot anterior."""
+
+        with self._lock:
+            self._delete(site, version, folder)
+            source = self._rowid(site, from_version, from_folder)
+            if source is not None:
+                cursor = self._conn.execute(
+                    "INSERT INTO pages (title, body, url, site, version, folder) "
+                    "SELECT title, body, url, site, ?, ? FROM pages WHERE rowid = ?",
+                    (version, folder, source))
+                if cursor.rowcount:
+                    self._set_rowid(site, version, folder, cursor.lastrowid)
+            self._maybe_commit()
+
+    def search(self, query, limit=20, offset=0):
+        """
+        Întoarce (total, rezultate) pentru query; fiecare rezultat este un
+        dicționar cu site, version, folder, url, title și snippet.
+        """
+
+        match = to_match_expression(query)
+        if not match:
+            return 0, []
+
+        with self._lock:
+            try:
+                total = self._conn.execute("SELECT count(*) FROM pages WHERE pages MATCH ?", (match,)).fetchone()[0]
+                rows = self._conn.execute(
+                    "SELECT site, version, folder, url, title, "
+                    "snippet(pages, 1, ?, ?, '…', 16) FROM pages WHERE pages MATCH ? "
+                    "ORDER BY bm25(pages, 5.0, 1.0) LIMIT ? OFFSET ?",
+                    (SNIPPET_START, SNIPPET_END, match, limit, offset)).fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"[eroare-căutare] Interogare invalidă {query!r}: {e}")
+                return 0, []
+
+        keys = ('site', 'version', 'folder', 'url', 'title', 'snippet')
+        return total, [dict(zip(keys, row)) for row in rows]
+
+    def flush(self):
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+            self._last_commit = time.monotonic()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def _rowid(self, site, version, folder):
+        row = self._conn.execute("SELECT page_rowid FROM page_rows WHERE site = ? AND version = ? AND folder = ?",
+                                 (site, version, folder)).fetchone()
+        return row[0] if row else None
+
+    def _set_rowid(self, site, version, folder, rowid):
+        self._conn.execute("INSERT OR REPLACE INTO page_rows (site, version, folder, page_rowid) VALUES (?, ?, ?, ?)",
+                           (site, version, folder, rowid))
+
+    def _delete(self, site, version, folder):
+        rowid = self._rowid(site, version, folder)
+        if rowid is not None:
+            self._conn.execute("DELETE FROM pages WHERE rowid = ?", (rowid,))
+            self._conn.execute("DELETE FROM page_rows WHERE site = ? AND version = ? AND folder = ?",
+                               (site, version, folder))
+
+    def _maybe_commit(self):
+        self._pending += 1
+        if self._pending >= self.commit_every or time.monotonic() - self._last_commit >= self.commit_interval:
+            self._conn.commit()
+            self._pending = 0
+            self._last_commit = time.monotonic()
+
+
+def to_match_expression(query):
+    """Transformă textul introdus de utilizator într-o expresie FTS5 sigură (toți termenii, cu prefix)."""
+
+    terms = re.findall(r'\w+', query, flags=re.UNICODE)
+    return ' '.join(f'"{term}"*' for term in terms)
@@ -1,10 +1,38 @@
-from flask import Flask, request, send_file, render_template_string, abort, url_for
+from flask import Flask, Response, g, request, send_file, abort, url_for
+from markupsafe import Markup, escape
 import os
+import gzip
+import hashlib
+import logging
 import mimetypes 
+import threading
+import time
+import uuid
+from functools import lru_cache
 from urllib.parse import urlparse
+from asset_store import STORE_DIR_NAME
+from archive_index import ArchiveIndex
+from search_index import SearchIndex, SEARCH_DB_FILE, SNIPPET_START, SNIPPET_END
+from packfile import open_pack, read_stored_page
+from page_store import REF_SUFFIX, read_page_ref
+from metrics import CACHE_LOOKUPS, HTTP_LATENCY, HTTP_REQUESTS, combined_metrics, metrics
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 ARCHIVE_DIR = "archive"
+LOG_LEVEL = "INFO" # "DEBUG" afișează detaliile fiecărei cereri /view
+SEARCH_PAGE_SIZE = 20
+LIST_PAGE_SIZE = 200 # Domenii, snapshot-uri sau pagini afișate pe o pagină de listă
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600 # Resursele din _store sunt adresate după conținut
+
+# Variantele precomprimate scrise la arhivare, în ordinea preferinței
+PRECOMPRESSED_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+PACK_CHUNK_SIZE = 64 * 1024
+STORED_PAGE_CACHE_SIZE = 512 # Pagini decomprimate din _pages/ păstrate în memorie
+STORED_PAGE_GZIP_LEVEL = 6
+# Cu mai multe procese (gunicorn), fiecare își scrie metricile în acest director, iar /metrics le adună
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 1.0 # Secunde între două scrieri ale metricilor unui proces
 
 # Adăugăm tipuri MIME comune, dacă nu sunt deja înregistrate
 mimetypes.add_type("text/css", ".css")
@@ -19,6 +47,178 @@ mimetypes.add_type("font/woff2", ".woff2")
 mimetypes.add_type("font/ttf", ".ttf")
 mimetypes.add_type("font/otf", ".otf")
 
+_archive_index = None
+
+def get_archive_index():
+    """Indexul arhivei, construit la prima folosire și reîmprospătat după mtime."""
+
+    global _archive_index
+    if _archive_index is None or _archive_index.archive_dir != ARCHIVE_DIR:
+        _archive_index = ArchiveIndex(ARCHIVE_DIR)
+    return _archive_index
+
+_search_index = None
+
+def get_search_index():
+    """Indexul full-text creat de arhivator, sau None dacă nu există încă."""
+
+    global _search_index
+    db_path = os.path.join(ARCHIVE_DIR, SEARCH_DB_FILE)
+    if _search_index is None or _search_index.db_path != db_path:
+        if not os.path.exists(db_path):
+            return None
+        _search_index = SearchIndex(db_path)
+    return _search_index
+
+@lru_cache(maxsize=8192)
+def _file_etag(path, mtime_ns, size):
+    """ETag puternic din hash-ul conținutului; cache-ul e invalidat de mtime/dimensiune."""
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def _choose_encoding(full_file_path):
+    """Alege varianta precomprimată acceptată de client: (cale, encoding) sau (cale originală, None)."""
+
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        if request.accept_encodings[encoding] and os.path.exists(full_file_path + suffix):
+            return full_file_path + suffix, encoding
+    return full_file_path, None
+
+@lru_cache(maxsize=STORED_PAGE_CACHE_SIZE)
+def _stored_page(snapshot_dir, name, encoding=None):
+    """
+    Pagina din depozitul comun al domeniului (sau din pack-ul snapshot-ului),
+    decomprimată (sau gzip pentru client). Ridică LookupError dacă lipsește.
+    """
+
+    if encoding == 'gzip':
+        return gzip.compress(_stored_page(snapshot_dir, name, None), STORED_PAGE_GZIP_LEVEL)
+    data = read_stored_page(snapshot_dir, name)
+    if data is None:
+        # lru_cache does not keep exceptions: a page still being written is found on the next request
+        raise LookupError(name)
+    return data
+
+def _page_ref(full_file_path, reader, page_path):
+    """Numele paginii din depozitul comun indicat de fișierul .ref (director sau pack), sau None."""
+
+    if os.path.exists(full_file_path + REF_SUFFIX):
+        return read_page_ref(full_file_path + REF_SUFFIX)
+    if reader is not None and page_path + REF_SUFFIX in reader:
+        return bytes(reader.get(page_path + REF_SUFFIX)).decode('utf-8').strip()
+    return None
+
+def _send_stored_page(site, version, name, mime_type):
+    """Servește o pagină din depozitul comun; ETag-ul este hash-ul conținutului ei."""
+
+    encoding = 'gzip' if request.accept_encodings['gzip'] else None
+    try:
+        data = _stored_page(os.path.abspath(os.path.join(ARCHIVE_DIR, site, version)), name, encoding)
+    except LookupError:
+        abort(404, description=f"Pagina {name} lipsește din depozitul domeniului {site}")
+
+    response = Response(data, mimetype=mime_type)
+    response.set_etag(name + (f"-{encoding}" if encoding else ""))
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+
+def _iter_chunks(view):
+    # WSGI cere bytes: copiem câte o bucată, nu tot fișierul
+    for start in range(0, len(view), PACK_CHUNK_SIZE):
+        yield bytes(view[start:start + PACK_CHUNK_SIZE])
+
+def _send_packed(reader, page_path, mime_type):
+    """Servește un fișier dintr-un snapshot împachetat, citit din mmap pe bucăți."""
+
+    serve_path, encoding = page_path, None
+    for candidate, suffix in PRECOMPRESSED_ENCODINGS:
+        if request.accept_encodings[candidate] and page_path + suffix in reader:
+            serve_path, encoding = page_path + suffix, candidate
+            break
+
+    data = reader.get(serve_path)
+    response = Response(_iter_chunks(data), mimetype=mime_type)
+    response.content_length = len(data)
+    response.set_etag(reader.etag(page_path) + (f"-{encoding}" if encoding else ""))
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+
+@app.before_request
+def _start_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def _record_request(response):
+    """Latența și statusul fiecărei cereri, plus revalidările reușite (304) ale clienților."""
+
+    endpoint = request.url_rule.endpoint if request.url_rule else 'not_found'
+    started = g.get('request_started')
+    if started is not None:
+        metrics.observe(HTTP_LATENCY, time.perf_counter() - started, endpoint=endpoint)
+    metrics.inc(HTTP_REQUESTS, endpoint=endpoint, status=response.status_code)
+    if request.if_none_match:
+        metrics.inc(CACHE_LOOKUPS, cache='http_conditional', result='hit' if response.status_code == 304 else 'miss')
+    flush_metrics()
+    return response
+
+_metrics_flushed = 0.0
+_metrics_flush_lock = threading.Lock()
+_metrics_file = None # (pid, nume): un PID refolosit de un proces nou nu suprascrie fișierul celui vechi
+
+def flush_metrics(force=False):
+    """
+    Cu METRICS_DIR, scrie metricile procesului în METRICS_DIR/worker-<pid>-<token>.json
+    (cel mult o dată la METRICS_FLUSH_INTERVAL secunde, dacă nu e forțat).
+    """
+
+    global _metrics_flushed
+    if not METRICS_DIR:
+        return
+    now = time.monotonic()
+    if not force and now - _metrics_flushed < METRICS_FLUSH_INTERVAL:
+        return
+    with _metrics_flush_lock:
+        if not force and now - _metrics_flushed < METRICS_FLUSH_INTERVAL:
+            return
+        _metrics_flushed = now
+        _record_cache_stats()
+        metrics.dump(os.path.join(METRICS_DIR, _metrics_file_name()))
+
+def _metrics_file_name():
+    """Numele fișierului de metrici al procesului, nou după fork (token unic per proces)."""
+
+    global _metrics_file
+    pid = os.getpid()
+    if _metrics_file is None or _metrics_file[0] != pid:
+        _metrics_file = (pid, f"worker-{pid}-{uuid.uuid4().hex}.json")
+    return _metrics_file[1]
+
+def _record_cache_stats():
+    info = _file_etag.cache_info()
+    metrics.set(CACHE_LOOKUPS, info.hits, cache='file_etag', result='hit')
+    metrics.set(CACHE_LOOKUPS, info.misses, cache='file_etag', result='miss')
+    info = _stored_page.cache_info()
+    metrics.set(CACHE_LOOKUPS, info.hits, cache='stored_page', result='hit')
+    metrics.set(CACHE_LOOKUPS, info.misses, cache='stored_page', result='miss')
+
+def _snippet_markup(snippet):
+    """Escapează fragmentul și marchează cuvintele găsite cu <mark>."""
+
+    text = str(escape(snippet or ''))
+    return Markup(text.replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>'))
+
 
 TEMPLATE = """
 <!DOCTYPE html>
@@ -55,6 +255,7 @@ TEMPLATE = """
         .list-group-item a:hover { text-decoration: underline; }
         .btn-back { margin-top: 20px; }
         .card-header { background-color: #e9ecef; border-bottom: 1px solid #dee2e6; }
+        .list-group-item .snippet { display: block; color: #6c757d; font-size: 0.9em; font-weight: normal; }
         .footer { background-color: #343a40; color: white; padding: 20px 0; text-align: center; } /* Fără margin-top aici */
     </style>
 </head>
@@ -86,13 +287,21 @@ TEMPLATE = """
             <div class="card-body p-4">
                 {% if items %}
                     <ul class="list-group list-group-flush">
-                        {% for label, link in items %}
+                        {% for item in items %}
                         <li class="list-group-item d-flex justify-content-between align-items-center rounded-lg mb-2 shadow-sm">
-                            <a href="{{ link }}" class="flex-grow-1 p-2">{{ label }}</a>
-                            <span class="badge bg-primary rounded-pill">{{ loop.index }}</span>
+                            <a href="{{ item[1] }}" class="flex-grow-1 p-2">{{ item[0] }}
+                                {% if item|length > 2 and item[2] %}<span class="snippet">{{ item[2] }}</span>{% endif %}
+                            </a>
+                            <span class="badge bg-primary rounded-pill">{{ loop.index + (start_index or 0) }}</span>
                         </li>
                         {% endfor %}
                     </ul>
+                    {% if prev_link or next_link %}
+                    <nav class="d-flex justify-content-between mt-3">
+                        {% if prev_link %}<a href="{{ prev_link }}" class="btn btn-outline-primary rounded-pill">&laquo; Anterioare</a>{% else %}<span></span>{% endif %}
+                        {% if next_link %}<a href="{{ next_link }}" class="btn btn-outline-primary rounded-pill">Următoare &raquo;</a>{% endif %}
+                    </nav>
+                    {% endif %}
                 {% else %}
                     <p class="text-muted text-center">Nu există rezultate.</p>
                 {% endif %}
@@ -116,111 +325,160 @@ TEMPLATE = """
 </html>
 """
 
+# Compiled once: render_template_string compiled the template again on every request
+_template = app.jinja_env.from_string(TEMPLATE)
+
+def render_listing(**context):
+    """Randează șablonul comun cu contextul Flask (url_for, request)."""
+
+    app.update_template_context(context)
+    return _template.render(context)
+
+def _page_number():
+    return max(request.args.get('page', 1, type=int), 1)
+
+def _paginate(entries, endpoint, **values):
+    """
+    Felia din entries pentru pagina cerută (?page=N), cu LIST_PAGE_SIZE
+    elemente: (felie, offset, link spre pagina anterioară, link spre următoarea).
+    """
+
+    page = _page_number()
+    offset = (page - 1) * LIST_PAGE_SIZE
+    prev_link = url_for(endpoint, page=page - 1, **values) if page > 1 else None
+    next_link = url_for(endpoint, page=page + 1, **values) if offset + LIST_PAGE_SIZE < len(entries) else None
+    return entries[offset:offset + LIST_PAGE_SIZE], offset, prev_link, next_link
+
 @app.route("/")
 def index():
     """Listează toate domeniile arhivate disponibile."""
     if not os.path.exists(ARCHIVE_DIR):
-        return render_template_string(TEMPLATE, title=" Nicio arhivă disponibilă.", items=[], back_link=None)
+        return render_listing(title=" Nicio arhivă disponibilă.", items=[], back_link=None)
     
-    sites = sorted(os.listdir(ARCHIVE_DIR))
-    items = [(site, f"/site/{site}") for site in sites]
-    return render_template_string(TEMPLATE, title="🌐 Arhive disponibile", items=items, back_link=None)
+    sites = get_archive_index().sites()
+    shown, offset, prev_link, next_link = _paginate(sites, 'index')
+    items = [(site, f"/site/{site}") for site in shown]
+    return render_listing(title="🌐 Arhive disponibile", items=items, back_link=None,
+                          start_index=offset, prev_link=prev_link, next_link=next_link)
 
 @app.route("/site/<site>")
 def list_snapshots(site):
     """Listează snapshot-urile (versiunile) pentru un anumit domeniu."""
-    site_dir = os.path.join(ARCHIVE_DIR, site)
-    if not os.path.exists(site_dir):
+    snapshots = get_archive_index().snapshots(site)
+    if snapshots is None:
         abort(404, description=f"Arhiva pentru domeniul '{site}' nu a fost găsită.")
         
-    snapshots = sorted(os.listdir(site_dir), reverse=True) 
-    items = [(snap, f"/snapshot/{site}/{snap}") for snap in snapshots]
-    return render_template_string(TEMPLATE, title=f"Snapshot-uri pentru {site}", items=items, back_link="/")
+    shown, offset, prev_link, next_link = _paginate(snapshots, 'list_snapshots', site=site)
+    items = [(snap, f"/snapshot/{site}/{snap}") for snap in shown]
+    return render_listing(title=f"Snapshot-uri pentru {site}", items=items, back_link="/",
+                          start_index=offset, prev_link=prev_link, next_link=next_link)
 
 @app.route("/snapshot/<site>/<version>")
 def list_pages_in_snapshot(site, version):
     """Listează paginile HTML arhivate într-un anumit snapshot."""
-    base_snapshot_path = os.path.join(ARCHIVE_DIR, site, version)
-    if not os.path.exists(base_snapshot_path):
+    pages = get_archive_index().pages(site, version)
+    if pages is None:
         abort(404, description=f"Snapshot-ul '{version}' pentru '{site}' nu a fost găsit.")
-    
-    pages = []
-
-    for item_name in os.listdir(base_snapshot_path):
-        item_path = os.path.join(base_snapshot_path, item_name)
-        if os.path.isdir(item_path) and os.path.exists(os.path.join(item_path, 'index.html')):
-            pages.append(item_name) 
             
+    # Doar pagina curentă a listei este construită (snapshot-urile mari au zeci de mii de pagini)
+    shown, offset, prev_link, next_link = _paginate(pages, 'list_pages_in_snapshot', site=site, version=version)
     items = []
-    for page_folder_name in sorted(pages):
+    for page_folder_name in shown:
         # Link-ul real va fi către index.html din acel folder
         view_link = f"/view/{site}/{version}/{page_folder_name}/index.html"
         # Eticheta afișată poate fi numele folderului, care este mai descriptiv
         items.append((page_folder_name, view_link))
 
-    return render_template_string(TEMPLATE, title=f"Pagini salvate în {version}", items=items, back_link=f"/site/{site}")
+    return render_listing(title=f"Pagini salvate în {version} ({len(pages)})", items=items, back_link=f"/site/{site}",
+                          start_index=offset, prev_link=prev_link, next_link=next_link)
 
 @app.route("/view/<site>/<version>/<path:page_path>")
 def view_snapshot_page(site, version, page_path):
     """Servește fișierul solicitat din arhiva snapshot."""
-    print(f"[SERVER-DEBUG] Request received for site: {site}, version: {version}, page_path: {page_path}")
+    logger.debug("Request received for site: %s, version: %s, page_path: %s", site, version, page_path)
     
     # Construiește calea completă a fișierului pe sistemul de fișiere
-    full_file_path = os.path.join(ARCHIVE_DIR, site, version, page_path)
-    print(f"[SERVER-DEBUG] Attempting to serve file from absolute path: {full_file_path}")
+    in_store = page_path.startswith(STORE_DIR_NAME + '/')
+    if in_store:
+        # Resursele comune ale domeniului, partajate de toate snapshot-urile
+        snapshot_base_dir = os.path.abspath(os.path.join(ARCHIVE_DIR, site, STORE_DIR_NAME))
+        full_file_path = os.path.join(ARCHIVE_DIR, site, page_path)
+    else:
+        snapshot_base_dir = os.path.abspath(os.path.join(ARCHIVE_DIR, site, version))
+        full_file_path = os.path.join(ARCHIVE_DIR, site, version, page_path)
+    logger.debug("Attempting to serve file from path: %s", full_file_path)
 
-    snapshot_base_dir = os.path.abspath(os.path.join(ARCHIVE_DIR, site, version))
     requested_abs_path = os.path.abspath(full_file_path)
 
+    # Determină tipul MIME al fișierului
+    mime_type, _ = mimetypes.guess_type(full_file_path)
+    if mime_type is None:
+        mime_type = 'application/octet-stream' # Tip generic 
+
+    if not in_store and not os.path.exists(full_file_path):
+        reader = open_pack(os.path.join(ARCHIVE_DIR, site, version))
+        if reader is not None and page_path in reader:
+            logger.debug("Serving %s from packed snapshot %s/%s", page_path, site, version)
+            return _send_packed(reader, page_path, mime_type)
+
+        # Pagini păstrate o singură dată în depozitul comun al domeniului (page_store.py)
+        name = _page_ref(full_file_path, reader, page_path) if requested_abs_path.startswith(snapshot_base_dir) else None
+        if name:
+            logger.debug("Serving %s from the page store of %s (%s)", page_path, site, name)
+            return _send_stored_page(site, version, name, mime_type)
+
     if not os.path.exists(full_file_path):
-        print(f"[SERVER-DEBUG] File does NOT exist at: {full_file_path}")
+        logger.debug("File does not exist: %s", full_file_path)
         abort(404, description=f"Fișierul nu a fost găsit: {page_path}")
     
     if not requested_abs_path.startswith(snapshot_base_dir):
-        print(f"[SERVER-DEBUG] Directory traversal attempt detected. Requested: {requested_abs_path}, Base: {snapshot_base_dir}")
+        logger.warning("Directory traversal attempt detected. Requested: %s, Base: %s", requested_abs_path, snapshot_base_dir)
         abort(403, description=f"Acces interzis: {page_path}")
-
-    # Determină tipul MIME al fișierului
-    mime_type, _ = mimetypes.guess_type(full_file_path)
-    if mime_type is None:
-        mime_type = 'application/octet-stream' # Tip generic 
     
-    print(f"[SERVER-DEBUG] Serving {full_file_path} with MIME type {mime_type}")
-    return send_file(full_file_path, mimetype=mime_type)
+    if in_store:
+        # The file name is the SHA-256 of the content
+        etag = os.path.splitext(os.path.basename(full_file_path))[0]
+    else:
+        stat = os.stat(full_file_path)
+        etag = _file_etag(os.path.abspath(full_file_path), stat.st_mtime_ns, stat.st_size)
+
+    serve_path, encoding = _choose_encoding(full_file_path)
+    if encoding:
+        etag = f"{etag}-{encoding}"
+
+    logger.debug("Serving %s with MIME type %s", serve_path, mime_type)
+    # send_file răspunde singur cu 304 la If-None-Match și cu 206 la cereri Range
+    response = send_file(os.path.abspath(serve_path), mimetype=mime_type, etag=etag, conditional=True,
+                         max_age=IMMUTABLE_MAX_AGE if in_store else 0)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    if in_store:
+        response.cache_control.immutable = True
+    else:
+        # Paginile sunt revalidate cu ETag-ul lor (304 dacă nu s-au schimbat)
+        response.cache_control.no_cache = True
+    return response
 
 @app.route("/search")
 def search_archives():
-    """Caută prin domeniile, snapshot-urile și paginile arhivate."""
+    """Caută în numele arhivelor și, full-text, în conținutul paginilor arhivate."""
     query = request.args.get('query', '').strip().lower()
+    page = _page_number()
     results = []
     
     if not query:
-        return render_template_string(TEMPLATE, title="Căutare Arhive", items=[], search_query=query, back_link="/")
+        return render_listing(title="Căutare Arhive", items=[], search_query=query, back_link="/")
 
-    if not os.path.exists(ARCHIVE_DIR):
-        return render_template_string(TEMPLATE, title="Căutare Arhive", items=[], search_query=query, back_link="/")
-
-    # Caută în nume de domenii
-    for site_name in os.listdir(ARCHIVE_DIR):
-        if query in site_name.lower():
+    # Caută în numele domeniilor, snapshot-urilor și paginilor din index
+    for kind, site_name, snapshot_name, page_folder_name in get_archive_index().search(query):
+        if kind == 'site':
             results.append((f"Domeniu: {site_name}", url_for('list_snapshots', site=site_name)))
-        
-        site_path = os.path.join(ARCHIVE_DIR, site_name)
-        if os.path.isdir(site_path):
-            # Caută în nume de snapshot-uri
-            for snapshot_name in os.listdir(site_path):
-                if query in snapshot_name.lower():
-                    results.append((f"Snapshot: {site_name} / {snapshot_name}", url_for('list_pages_in_snapshot', site=site_name, version=snapshot_name)))
-                
-                snapshot_path = os.path.join(site_path, snapshot_name)
-                if os.path.isdir(snapshot_path):
-                    # Caută în nume de foldere de pagini
-                    for page_folder_name in os.listdir(snapshot_path):
-                        if query in page_folder_name.lower():
-                            # Verifică dacă este un folder de pagină valid (conține index.html)
-                            page_index_path = os.path.join(snapshot_path, page_folder_name, 'index.html')
-                            if os.path.exists(page_index_path):
-                                results.append((f"Pagină: {site_name} / {snapshot_name} / {page_folder_name}", url_for('view_snapshot_page', site=site_name, version=snapshot_name, page_path=f"{page_folder_name}/index.html")))
+        elif kind == 'snapshot':
+            results.append((f"Snapshot: {site_name} / {snapshot_name}", url_for('list_pages_in_snapshot', site=site_name, version=snapshot_name)))
+        else:
+            results.append((f"Pagină: {site_name} / {snapshot_name} / {page_folder_name}", url_for('view_snapshot_page', site=site_name, version=snapshot_name, page_path=f"{page_folder_name}/index.html")))
 
     # Elimină duplicatele din rezultate 
     unique_results = []
@@ -230,12 +488,51 @@ def search_archives():
             unique_results.append((label, link))
             seen_links.add(link)
 
-    return render_template_string(TEMPLATE, title=f"Rezultate căutare pentru '{query}'", items=unique_results, search_query=query, back_link="/")
+    # Rezultatele pe nume vin primele, urmate de cele full-text ordonate după relevanță
+    offset = (page - 1) * SEARCH_PAGE_SIZE
+    items = unique_results[offset:offset + SEARCH_PAGE_SIZE]
+    total = len(unique_results)
+
+    search_index = get_search_index()
+    if search_index is not None:
+        text_offset = max(offset - len(unique_results), 0)
+        text_limit = SEARCH_PAGE_SIZE - len(items)
+        text_total, hits = search_index.search(query, limit=text_limit, offset=text_offset)
+        total += text_total
+        for hit in hits:
+            label = f"{hit['title'] or hit['folder']} — {hit['site']} / {hit['version']}"
+            link = url_for('view_snapshot_page', site=hit['site'], version=hit['version'], page_path=f"{hit['folder']}/index.html")
+            items.append((label, link, _snippet_markup(hit['snippet'])))
+
+    prev_link = url_for('search_archives', query=query, page=page - 1) if page > 1 else None
+    next_link = url_for('search_archives', query=query, page=page + 1) if offset + SEARCH_PAGE_SIZE < total else None
+
+    return render_listing(title=f"Rezultate căutare pentru '{query}' ({total})", items=items, search_query=query,
+                          back_link="/", start_index=offset, prev_link=prev_link, next_link=next_link)
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """
+    Metricile serverului în formatul text Prometheus: cu METRICS_DIR, suma
+    tuturor proceselor (inclusiv a celor reciclate), altfel ale acestui proces.
+    """
+
+    if METRICS_DIR:
+        flush_metrics(force=True)
+        registry = combined_metrics(METRICS_DIR, metrics.buckets)
+    else:
+        _record_cache_stats()
+        registry = metrics
+    return Response(registry.to_prometheus(), mimetype='text/plain; version=0.0.4')
 
 
 if __name__ == "__main__":
     import sys
     
+    logging.basicConfig(level=LOG_LEVEL, format="[%(levelname)s] %(name)s: %(message)s")
     print("\n[i] Serverul web pornește...")
+    print("[i] Construiesc indexul arhivei...")
+    get_archive_index().refresh(force=True)
     print("[i] Accesează http://127.0.0.1:5000 în browser.")
+    print("[i] Pentru mai mulți utilizatori simultani: gunicorn -c gunicorn.conf.py wsgi:app")
     app.run(debug=True) 
@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from browser_pool import BrowserPool
+
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class FakeFactory:
+    def __init__(self):
+        self.drivers = []
+
+    def __call__(self):
+        driver = FakeDriver(len(self.drivers))
+        self.drivers.append(driver)
+        return driver
+
+
+def test_driver_is_reused_then_recycled_after_max_pages():
+    factory = FakeFactory()
+    pool = BrowserPool(size=1, max_pages=2, driver_factory=factory)
+
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+
+    # Two pages done: the driver is closed and the next page gets a new one
+    assert first.quit_calls == 1
+    second = pool.acquire()
+    assert second is not first
+    assert len(factory.drivers) == 2
+    pool.release(second)
+    pool.shutdown()
+
+
+def test_crashed_driver_is_replaced():
+    factory = FakeFactory()
+    pool = BrowserPool(size=1, max_pages=50, driver_factory=factory)
+
+    with pytest.raises(RuntimeError, match="crash"):
+        with pool.driver() as driver:
+            raise RuntimeError("crash")
+
+    assert driver.quit_calls == 1
+    with pool.driver() as replacement:
+        assert replacement is not driver
+    assert replacement.quit_calls == 0
+    pool.shutdown()
+    assert replacement.quit_calls == 1
+
+
+def test_failed_startup_frees_its_slot():
+    calls = []
+
+    def factory():
+        calls.append(None)
+        if len(calls) == 1:
+            raise OSError("geckodriver missing")
+        return FakeDriver(len(calls))
+
+    pool = BrowserPool(size=1, driver_factory=factory)
+    with pytest.raises(OSError):
+        pool.acquire()
+    assert isinstance(pool.acquire(), FakeDriver)
+
+
+def test_shutdown_with_drivers_checked_out():
+    factory = FakeFactory()
+    pool = BrowserPool(size=2, driver_factory=factory)
+    busy = pool.acquire()
+    idle = pool.acquire()
+    pool.release(idle)
+
+    pool.shutdown()
+
+    # Idle drivers close right away; the one in use closes when it comes back
+    assert idle.quit_calls == 1
+    assert busy.quit_calls == 0
+    pool.release(busy)
+    assert busy.quit_calls == 1
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_shutdown_wakes_threads_waiting_for_a_driver():
+    pool = BrowserPool(size=1, driver_factory=FakeFactory())
+    busy = pool.acquire()
+    errors = []
+
+    def wait_for_driver():
+        try:
+            pool.acquire()
+        except RuntimeError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait_for_driver)
+    waiter.start()
+    pool.shutdown()
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert len(errors) == 1
+    pool.release(busy)
+    assert busy.quit_calls == 1
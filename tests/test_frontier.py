@@ -0,0 +1,103 @@
+import threading
+import time
+
+from frontier import Frontier
+
+
+def drain(frontier):
+    urls = []
+    while True:
+        url = frontier.get()
+        if url is None:
+            return urls
+        urls.append(url)
+        frontier.task_done(url)
+
+
+def test_add_deduplicates_url_variants():
+    frontier = Frontier(min_delay=0)
+
+    assert frontier.add("http://example.com/about")
+    assert not frontier.add("http://example.com/about/")
+    assert not frontier.add("http://EXAMPLE.com:80/about/index.html?utm_source=mail")
+    assert frontier.add("http://example.com/contact")
+    assert len(frontier) == 2
+
+    assert drain(frontier) == ["http://example.com/about", "http://example.com/contact"]
+    # A URL already crawled is not queued again
+    assert not frontier.add("http://example.com/about")
+
+
+def test_restore_skips_seen_urls_and_requeues_pending():
+    frontier = Frontier(min_delay=0)
+    frontier.restore(["http://example.com/", "http://example.com/a"], ["http://example.com/a"])
+
+    assert not frontier.add("http://example.com/")
+    assert drain(frontier) == ["http://example.com/a"]
+
+
+def test_per_host_limit_caps_concurrent_pages():
+    frontier = Frontier(per_host_limit=2, min_delay=0)
+    for number in range(3):
+        frontier.add(f"http://a.example/{number}")
+    frontier.add("http://b.example/0")
+
+    taken = [frontier.get() for _ in range(3)]
+    # The third page of host a waits; host b is served meanwhile
+    assert sorted(taken) == ["http://a.example/0", "http://a.example/1", "http://b.example/0"]
+
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(frontier.get()))
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive()
+
+    frontier.task_done("http://a.example/0")
+    waiter.join(timeout=5)
+    assert got == ["http://a.example/2"]
+
+
+def test_min_delay_spaces_requests_to_the_same_host():
+    delay = 0.1
+    frontier = Frontier(per_host_limit=10, min_delay=delay)
+    for number in range(3):
+        frontier.add(f"http://a.example/{number}")
+
+    starts = []
+    for _ in range(3):
+        frontier.get()
+        starts.append(time.monotonic())
+
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert all(gap >= delay * 0.95 for gap in gaps)
+
+
+def test_host_delay_overrides_min_delay_for_one_host():
+    frontier = Frontier(per_host_limit=10, min_delay=0)
+    frontier.set_host_delay("slow.example", 0.2)
+    frontier.add("http://slow.example/0")
+    frontier.add("http://slow.example/1")
+    frontier.add("http://fast.example/0")
+    frontier.add("http://fast.example/1")
+
+    started = time.monotonic()
+    order = [frontier.get() for _ in range(4)]
+    # Both fast pages come before the second slow one, which waits for its host delay
+    assert order[-1] == "http://slow.example/1"
+    assert sorted(order[:3]) == ["http://fast.example/0", "http://fast.example/1", "http://slow.example/0"]
+    assert time.monotonic() - started >= 0.19
+
+
+def test_host_delay_never_goes_below_min_delay():
+    frontier = Frontier(min_delay=0.5)
+    frontier.set_host_delay("a.example", 0.1)
+    assert frontier._delays["a.example"] == 0.5
+
+
+def test_get_returns_none_when_drained_or_closed():
+    frontier = Frontier(min_delay=0)
+    assert frontier.get() is None
+
+    frontier.add("http://example.com/")
+    frontier.close()
+    assert frontier.get() is None
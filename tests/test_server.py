@@ -0,0 +1,60 @@
+import threading
+import urllib.request
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import pytest
+
+import server
+from packfile import is_packed, pack_snapshot
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def live_server(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "ARCHIVE_DIR", str(tmp_path))
+    httpd = make_server("127.0.0.1", 0, server.app, handler_class=QuietHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetch(url, **headers):
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+        return response.status, response.read()
+
+
+def test_packed_file_is_served_through_wsgi(tmp_path, monkeypatch, live_server):
+    monkeypatch.setattr(server, "PACK_CHUNK_SIZE", 1000)
+    snapshot = tmp_path / "example.com" / "20240101000000"
+    (snapshot / "about").mkdir(parents=True)
+    content = bytes(range(256)) * 20
+    (snapshot / "about" / "logo.png").write_bytes(content)
+    pack_snapshot(str(snapshot))
+    assert is_packed(str(snapshot))
+    assert not (snapshot / "about").exists()
+
+    url = f"{live_server}/view/example.com/20240101000000/about/logo.png"
+    # Several chunks, each of them sent by the WSGI server as bytes
+    assert fetch(url) == (200, content)
+    assert fetch(url, Range="bytes=1500-2499") == (206, content[1500:2500])
+
+
+def test_each_process_flushes_metrics_to_its_own_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "METRICS_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "_metrics_file", None)
+    server.flush_metrics(force=True)
+    server.flush_metrics(force=True)
+    assert len(list(tmp_path.glob("worker-*.json"))) == 1
+
+    # A forked child (or a later process with a recycled PID) gets a file of its own
+    monkeypatch.setattr(server.os, "getpid", lambda: 1)
+    server.flush_metrics(force=True)
+    monkeypatch.setattr(server, "_metrics_file", None)
+    server.flush_metrics(force=True)
+    assert len(list(tmp_path.glob("worker-1-*.json"))) == 2
@@ -0,0 +1,70 @@
+from utils import MAX_FOLDER_NAME, UrlCanonicalizer, _safe_folder_name
+
+
+def test_canonical_form_of_url_variants():
+    canonicalizer = UrlCanonicalizer()
+    canonical = "http://example.com/list?a=1&b=2"
+
+    assert canonicalizer.canonicalize("http://example.com/list?b=2&a=1") == canonical
+    assert canonicalizer.canonicalize("HTTP://Example.COM:80/list?a=1&utm_source=mail&b=2") == canonical
+    assert canonicalizer.canonicalize("http://example.com/list?a=1&b=2#top") == canonical
+    assert canonicalizer.canonicalize("http://example.com/docs/index.html") == "http://example.com/docs/"
+    # A port other than the default one is kept
+    assert canonicalizer.canonicalize("https://example.com:8443/") == "https://example.com:8443/"
+
+
+def test_query_pairs_are_kept_as_written():
+    canonicalizer = UrlCanonicalizer()
+
+    assert canonicalizer.canonicalize("http://example.com/?q=a%20b&page") == "http://example.com/?page&q=a%20b"
+    # Repeated parameters keep their relative order
+    assert canonicalizer.canonicalize("http://example.com/?b=1&a=2&a=1") == "http://example.com/?a=2&a=1&b=1"
+    # The name is decoded only to match the patterns
+    assert canonicalizer.canonicalize("http://example.com/?UTM%5FSource=x&id=3") == "http://example.com/?id=3"
+
+
+def test_strip_params_can_be_configured():
+    canonicalizer = UrlCanonicalizer(strip_params=("sessionid",))
+
+    assert canonicalizer.canonicalize("http://example.com/?sessionid=42&utm_source=x") == \
+        "http://example.com/?utm_source=x"
+
+
+def test_key_ignores_trailing_slash():
+    canonicalizer = UrlCanonicalizer()
+
+    assert canonicalizer.key("http://example.com/about") == canonicalizer.key("http://example.com/about/")
+    assert canonicalizer.key("http://example.com/about/index.html") == "http://example.com/about/"
+
+
+def test_folder_name_of_plain_paths():
+    assert _safe_folder_name("http://example.com/") == "index"
+    assert _safe_folder_name("http://example.com/blog/post-1/") == "blog_post-1"
+    # Scheme and host do not change the folder
+    assert _safe_folder_name("https://example.com/blog/post-1/") == "blog_post-1"
+
+
+def test_folder_names_do_not_collide():
+    names = {
+        _safe_folder_name("http://example.com/a/b/"),
+        _safe_folder_name("http://example.com/a_b/"),
+        _safe_folder_name("http://example.com/a-b/"),
+        _safe_folder_name("http://example.com/index/"),
+        _safe_folder_name("http://example.com/?page=2"),
+        _safe_folder_name("http://example.com/a/b/?page=2"),
+    }
+
+    assert len(names) == 6
+    # /index/ is not the root page
+    assert "index" not in names
+
+
+def test_hashed_folder_names():
+    with_query = _safe_folder_name("http://example.com/list/?page=2")
+    assert with_query.startswith("list__page_2_")
+    # Only the URL decides the name, not the order in which names were handed out
+    assert _safe_folder_name.__wrapped__("http://example.com/list/?page=2") == with_query
+
+    long_name = _safe_folder_name("http://example.com/" + "segment/" * 30)
+    assert len(long_name) == MAX_FOLDER_NAME
+    assert long_name != _safe_folder_name("http://example.com/" + "segment/" * 31)
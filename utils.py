@@ -1,8 +1,29 @@
 from datetime import datetime
-from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from urllib.parse import unquote_plus, urlparse, urlunparse
+import gzip
+import hashlib
 import os
 import re
 
+try:
+    import brotli
+except ImportError: # brotli este opțional; fără el se generează doar variantele .gz
+    brotli = None
+
+# Text formats worth storing precompressed next to the original
+COMPRESSIBLE_EXTENSIONS = {'.html', '.htm', '.css', '.js', '.svg', '.json', '.xml', '.txt', '.csv', '.ico', '.ttf', '.otf'}
+MIN_COMPRESS_SIZE = 1024
+
+# Query parameters that never change the page (shell-style patterns, case-insensitive)
+DEFAULT_STRIP_PARAMS = ('utm_*', 'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_ga', '_gl', 'igshid')
+INDEX_ALIASES = ('index.html', 'index.htm') # /dir/index.html este aceeași pagină cu /dir/
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+CANONICAL_CACHE_SIZE = 65536
+MAX_FOLDER_NAME = 100
+_PLAIN_SEGMENT_RE = re.compile(r'[^\W_]+(?:[.\-]+[^\W_]+)*') # Segment de cale fără '_' și fără caractere înlocuite
+
 def get_timestamp_folder(base_url, archive_root):
 
     domain = urlparse(base_url).netloc
@@ -14,30 +35,175 @@ def load_dictionary(filename):
     with open(filename, "r") as f:
             return [line.strip() for line in f.readlines() if line.strip()]
 
+def iter_dictionary(filename):
+    """Căile din dicționar, citite linie cu linie (fișierul nu este încărcat în memorie)."""
+
+    with open(filename, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+class UrlCanonicalizer:
+    """
+    Forma canonică a URL-urilor, comună crawler-ului, rescrierii link-urilor
+    și numelor de foldere din snapshot.
+
+    Două variante ale aceluiași URL (parametri în altă ordine, parametri de
+    urmărire precum utm_*, portul implicit, host-ul cu majuscule, /index.html
+    la final, fragmentul #...) au aceeași formă canonică, deci sunt
+    descărcate și salvate o singură dată. Folderul fiecărei pagini depinde
+    doar de forma ei canonică, deci este același în orice ordine ar fi găsite
+    paginile, după o reluare și de la un snapshot la altul.
+    """
+
+    def __init__(self, strip_params=DEFAULT_STRIP_PARAMS, index_aliases=INDEX_ALIASES):
+        self.configure(strip_params, index_aliases)
+
+    def configure(self, strip_params=DEFAULT_STRIP_PARAMS, index_aliases=INDEX_ALIASES):
+        """Schimbă regulile (ex. din main.py); trebuie apelată înainte de crawl."""
+
+        self.strip_params = tuple(pattern.lower() for pattern in strip_params)
+        self.index_aliases = tuple(index_aliases)
+        # Memoized per rule set: the same links appear on almost every page of a site
+        self.canonicalize = lru_cache(maxsize=CANONICAL_CACHE_SIZE)(self._canonicalize)
+        self.key = lru_cache(maxsize=CANONICAL_CACHE_SIZE)(self._key)
+
+    def folder_name(self, url):
+        """Numele folderului paginii în snapshot, unic pentru fiecare cheie canonică."""
+
+        return _safe_folder_name(self.key(url))
+
+    def _canonicalize(self, url):
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        netloc = _canonical_netloc(parsed, scheme)
+
+        path = parsed.path or '/'
+        directory, _, last = path.rpartition('/')
+        if last in self.index_aliases:
+            path = directory + '/'
+
+        # Pairs are kept as written (no decoding/re-encoding), so the canonical URL fetches the same thing
+        pairs = [pair for pair in parsed.query.split('&') if pair and not self._stripped(pair.partition('=')[0])]
+        # Stable sort: repeated parameters (a=1&a=2) keep their relative order
+        query = '&'.join(sorted(pairs, key=lambda pair: pair.partition('=')[0]))
+
+        return urlunparse((scheme, netloc, path, parsed.params, query, ''))
+
+    def _key(self, url):
+        # /about and /about/ are the same page (and the same folder)
+        parsed = urlparse(self.canonicalize(url))
+        path = parsed.path if parsed.path.endswith('/') else parsed.path + '/'
+        return urlunparse(parsed._replace(path=path))
+
+    def _stripped(self, name):
+        name = unquote_plus(name).lower()
+        return any(fnmatchcase(name, pattern) for pattern in self.strip_params)
+
+
+url_canonicalizer = UrlCanonicalizer()
+
+def canonicalize_url(url):
+    """URL-ul în forma canonică (vezi UrlCanonicalizer); poate fi cerut ca atare."""
+
+    return url_canonicalizer.canonicalize(url)
+
+def url_key(url):
+    """Cheia de deduplicare: forma canonică, cu slash final în cale."""
+
+    return url_canonicalizer.key(url)
+
 def get_local_page_folder_name(url):
 
-    parsed_url = urlparse(url)
+    return url_canonicalizer.folder_name(url)
+
+def _canonical_netloc(parsed, scheme):
+    try:
+        port = parsed.port
+    except ValueError:
+        return parsed.netloc.lower()
+    host = parsed.hostname or ''
+    if ':' in host:
+        host = f"[{host}]" # IPv6
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        host += f":{port}"
+    userinfo = parsed.netloc.rpartition('@')[0]
+    return f"{userinfo}@{host}" if userinfo else host
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def _safe_folder_name(key):
+    """
+    Numele folderului depinde doar de cheia URL-ului, nu de ordinea în care
+    sunt văzute URL-urile. Numele simplu (ex. blog_post pentru /blog/post/)
+    este păstrat doar pentru căile din care poate fi refăcut; celelalte
+    (care conțin '_', caractere înlocuite, query etc.) primesc un sufix hash.
+    """
+
+    parsed_url = urlparse(key)
+    if parsed_url.path == '/' and not parsed_url.query and not parsed_url.params:
+        return "index"
 
     path_and_query = parsed_url.path
     if parsed_url.query:
         path_and_query += '?' + parsed_url.query
+    # The hash ignores scheme and host, like the name itself
+    location = urlunparse(parsed_url._replace(scheme='', netloc=''))
 
 
     safe_name = re.sub(r'[^\w\-_.]', '_', path_and_query).strip('_')
 
     if not safe_name:
-        return "index"
+        return _hashed_name("index", location)
     
-    max_len = 100
-    if len(safe_name) > max_len:
+    # Different URLs can sanitize to the same name (e.g. /a/b and /a_b)
+    lossless = (not parsed_url.query and not parsed_url.params and safe_name != "index"
+                and all(_PLAIN_SEGMENT_RE.fullmatch(segment) for segment in parsed_url.path[1:-1].split('/')))
+    if not lossless or len(safe_name) > MAX_FOLDER_NAME:
         # Folosește un hash pentru a scurta și asigura unicitatea dacă numele e prea lung
-        hash_suffix = hashlib.md5(safe_name.encode('utf-8')).hexdigest()[:8]
-        safe_name = safe_name[:max_len - len(hash_suffix) - 1] + '_' + hash_suffix
+        safe_name = _hashed_name(safe_name, location)
 
     return safe_name
 
+def _hashed_name(name, location):
+    hash_suffix = hashlib.md5(location.encode('utf-8')).hexdigest()[:8]
+    return name[:MAX_FOLDER_NAME - len(hash_suffix) - 1] + '_' + hash_suffix
+
 def get_local_page_path(url, snapshot_root):
 
     folder_name = get_local_page_folder_name(url)
     return os.path.join(snapshot_root, folder_name, 'index.html')
 
+def write_precompressed(path):
+    """
+    Scrie lângă fișier variantele comprimate path.gz (și path.br, dacă
+    modulul brotli este instalat), servite de server după Accept-Encoding.
+    O variantă este păstrată doar dacă este mai mică decât originalul.
+    """
+
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return
+
+    variants = [('.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', lambda d: brotli.compress(d, quality=11)))
+
+    for suffix, compress in variants:
+        compressed = compress(data) if len(data) >= MIN_COMPRESS_SIZE else data
+        if len(compressed) >= len(data):
+            # A stale variant from an earlier version of the file must not be served
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+            continue
+        tmp_path = path + suffix + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path + suffix)
+        except OSError as e:
+            print(f"[eroare] Nu am putut scrie {path + suffix}: {e}")
@@ -0,0 +1,25 @@
+"""
+Punctul de intrare WSGI al serverului de vizualizare, pentru modul de producție
+(mai multe procese, fără debug):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Directorul arhivei și nivelul de logging se pot schimba prin variabilele de
+mediu ARCHIVE_DIR și LOG_LEVEL; METRICS_DIR este directorul în care procesele
+își scriu metricile (vezi gunicorn.conf.py).
+"""
+import logging
+import os
+import server
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "WARNING") # Fără mesajele de depanare ale fiecărei cereri
+
+server.ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", server.ARCHIVE_DIR)
+# Set by gunicorn.conf.py: each worker writes its metrics there and /metrics adds them all up
+server.METRICS_DIR = os.environ.get("METRICS_DIR") or None
+logging.basicConfig(level=LOG_LEVEL, format="[%(levelname)s] %(name)s: %(message)s")
+
+# With preload_app the index is built once, before the workers are forked
+server.get_archive_index().refresh(force=True)
+
+app = server.app